@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Dataset, EquipmentData
+from .models import Dataset, DatasetTrendPoint, EquipmentData, IngestJob, ReportJob
 
 
 @admin.register(Dataset)
@@ -33,3 +33,24 @@ class EquipmentDataAdmin(admin.ModelAdmin):
             'fields': ('flowrate', 'pressure', 'temperature')
         }),
     )
+
+
+@admin.register(IngestJob)
+class IngestJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'dataset', 'status', 'rows_processed', 'created_at']
+    list_filter = ['status', 'created_at']
+    readonly_fields = ['created_at', 'started_at', 'finished_at']
+
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'dataset', 'status', 'created_at']
+    list_filter = ['status', 'created_at']
+    readonly_fields = ['created_at', 'started_at', 'finished_at']
+
+
+@admin.register(DatasetTrendPoint)
+class DatasetTrendPointAdmin(admin.ModelAdmin):
+    list_display = ['dataset_name', 'user', 'total_count', 'recorded_at']
+    list_filter = ['recorded_at', 'user']
+    search_fields = ['dataset_name', 'user__username']
@@ -0,0 +1,118 @@
+"""
+Outlier flags for equipment rows, derived from a dataset's statistics
+"""
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from .models import EquipmentData
+
+# Bits of EquipmentData.anomaly_flags
+ZSCORE = 1  # far from the dataset mean
+IQR = 2     # outside the dataset's Tukey fences
+TYPE = 4    # far from the mean of its own equipment type
+
+FLAGS = {'zscore': ZSCORE, 'iqr': IQR, 'type': TYPE}
+
+Z_THRESHOLD = 3.0
+IQR_FACTOR = 1.5
+
+
+def flag_values(flag):
+    """
+    Every anomaly_flags value with the given bit set, for an IN lookup
+    """
+    return [value for value in range(1, sum(FLAGS.values()) + 1) if value & flag]
+
+
+def flag_names(flags):
+    return [name for name, flag in FLAGS.items() if flags & flag]
+
+
+def score_frame(frame, statistics):
+    """
+    Vectorized flags and scores for a frame of rows.
+
+    frame has an equipment_type column plus one column per parameter in
+    statistics.parameters. Returns (flags, scores) arrays; scores are the
+    largest absolute z-score, overall or within the row's type, and are
+    zeroed for rows without any flag.
+    """
+    flags = np.zeros(len(frame), dtype=np.int16)
+    scores = np.zeros(len(frame))
+    by_type = {row['type']: row for row in statistics.type_statistics}
+    types = frame['equipment_type']
+
+    for field, stats in statistics.parameters.items():
+        values = frame[field].to_numpy(dtype='float64')
+
+        if stats['std'] > 0:
+            z = np.abs(values - stats['mean']) / stats['std']
+            flags[z > Z_THRESHOLD] |= ZSCORE
+            scores = np.maximum(scores, z)
+
+        spread = IQR_FACTOR * (stats['q3'] - stats['q1'])
+        outside = (values < stats['q1'] - spread) | (values > stats['q3'] + spread)
+        flags[outside] |= IQR
+
+        # Types with a single row (or identical values) have no spread to compare to
+        mean = types.map({t: row[field]['mean'] for t, row in by_type.items()}).to_numpy(dtype='float64')
+        std = types.map({t: row[field]['std'] for t, row in by_type.items()}).to_numpy(dtype='float64')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            type_z = np.where(std > 0, np.abs(values - mean) / std, 0.0)
+        type_z = np.nan_to_num(type_z)
+        flags[type_z > Z_THRESHOLD] |= TYPE
+        scores = np.maximum(scores, type_z)
+
+    scores[flags == 0] = 0.0
+    return flags, scores
+
+
+def detect_anomalies(dataset, statistics, chunk_size=None):
+    """
+    Flag a dataset's outliers and return the count per flag.
+
+    Rows are scored in chunks, each read by its own keyset query so no
+    cursor is open while the flagged rows (normally a small fraction) are
+    written back in batches of INGEST_BATCH_SIZE as they turn up; memory
+    stays bounded however many rows are flagged.
+    """
+    chunk_size = chunk_size or getattr(settings, 'INGEST_CHUNK_SIZE', 50000)
+    batch_size = getattr(settings, 'INGEST_BATCH_SIZE', 2000)
+    fields = list(statistics.parameters)
+    columns = ['id', 'equipment_type'] + fields
+    counts = dict.fromkeys(list(FLAGS) + ['total'], 0)
+    flagged_rows = []
+
+    def flush():
+        EquipmentData.objects.bulk_update(
+            flagged_rows, ['anomaly_flags', 'anomaly_score'], batch_size=batch_size
+        )
+        flagged_rows.clear()
+
+    def score_chunk(chunk):
+        frame = pd.DataFrame.from_records(chunk, columns=columns)
+        flags, scores = score_frame(frame, statistics)
+        flagged = np.flatnonzero(flags)
+        for name, flag in FLAGS.items():
+            counts[name] += int(np.count_nonzero(flags & flag))
+        counts['total'] += len(flagged)
+        for pk, flag, score in zip(frame['id'].to_numpy()[flagged], flags[flagged], scores[flagged]):
+            flagged_rows.append(
+                EquipmentData(id=int(pk), anomaly_flags=int(flag), anomaly_score=float(score))
+            )
+            if len(flagged_rows) >= batch_size:
+                flush()
+
+    # Clear flags from an earlier pass; only flagged rows are touched
+    dataset.equipment.filter(anomaly_score__gt=0).update(anomaly_flags=0, anomaly_score=0.0)
+
+    rows = dataset.equipment.order_by('id').values_list(*columns)
+    last_id = 0
+    while True:
+        chunk = list(rows.filter(id__gt=last_id)[:chunk_size])
+        if not chunk:
+            break
+        score_chunk(chunk)
+        last_id = chunk[-1][0]
+    flush()
+    return counts
@@ -0,0 +1,208 @@
+"""
+Per-user versioned cache of API responses and HTTP conditional GETs
+"""
+import functools
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import get_conditional_response
+from rest_framework.response import Response
+from .models import ResponseCacheVersion
+from .reports import REPORT_VERSION
+from .statistics import STATS_VERSION
+
+HITS_KEY = 'api_response:hits'
+MISSES_KEY = 'api_response:misses'
+
+
+class ResponseCache:
+    """
+    Response data cached per user under a version counter.
+
+    Any change to a user's datasets bumps their version, so entries are
+    never invalidated one by one; stale ones just stop being read and age
+    out. The version lives in the database (ResponseCacheVersion) and is
+    read once per request, so a change handled by one server process
+    invalidates the entries of all of them. The alias's own MAX_ENTRIES
+    bounds how many entries are kept: per process, least recently used
+    first, in local memory; across processes, culled regardless of use,
+    in a file cache. Hit and miss counters live in the backend, so they
+    only add up across processes when it is shared.
+    """
+
+    def __init__(self, alias=None, timeout=None):
+        self.alias = alias or getattr(settings, 'API_CACHE_ALIAS', 'default')
+        self.timeout = timeout or getattr(settings, 'API_CACHE_TIMEOUT', 3600)
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def user_version(self, request):
+        # One lookup per request, however many keys it builds
+        version = getattr(request, '_response_cache_version', None)
+        if version is None:
+            version = ResponseCacheVersion.objects.filter(
+                user_id=request.user.id
+            ).values_list('version', flat=True).first() or 0
+            request._response_cache_version = version
+        return version
+
+    def knows_user_version(self, request):
+        return getattr(request, '_response_cache_version', None) is not None
+
+    def bump_user_version(self, user_id):
+        # A fresh timestamp rather than +1: no read, and never a reused value
+        ResponseCacheVersion.objects.update_or_create(
+            user_id=user_id, defaults={'version': time.time_ns()}
+        )
+
+    def key(self, request, *parts):
+        digest = hashlib.sha256(':'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+        return f'api_response:{STATS_VERSION}:{request.user.id}:{self.user_version(request)}:{digest}'
+
+    def get(self, key):
+        data = self.backend.get(key)
+        if data is None:
+            self._count(MISSES_KEY)
+            return None
+        self._count(HITS_KEY)
+        return data
+
+    def set(self, key, data):
+        self.backend.set(key, data, self.timeout)
+
+    def _count(self, key):
+        try:
+            self.backend.incr(key)
+        except ValueError:
+            # Counter missing or evicted; add() keeps a racing process's value
+            if not self.backend.add(key, 1, None):
+                self.backend.incr(key)
+
+    def stats(self):
+        hits = self.backend.get(HITS_KEY) or 0
+        misses = self.backend.get(MISSES_KEY) or 0
+        return {
+            'backend': self.backend.__class__.__name__,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses), 4) if hits + misses else None,
+            'max_entries': getattr(self.backend, '_max_entries', None),
+        }
+
+
+response_cache = ResponseCache()
+
+
+def cache_response(method):
+    """
+    Serve a viewset action from the response cache when possible.
+
+    Only 200 responses to authenticated users are cached, keyed by the
+    action, its URL kwargs and the absolute URI: pagination links in the
+    body carry the scheme and host the client used.
+    Responses carry X-Cache: HIT or MISS.
+    """
+    @functools.wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return method(self, request, *args, **kwargs)
+
+        key = response_cache.key(
+            request, self.action, sorted(kwargs.items()), request.build_absolute_uri()
+        )
+        data = response_cache.get(key)
+        if data is not None:
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        response = method(self, request, *args, **kwargs)
+        if response.status_code == 200:
+            response_cache.set(key, response.data)
+        response['X-Cache'] = 'MISS'
+        return response
+    return wrapper
+
+
+def validators_key(request, pk):
+    return response_cache.key(request, 'validators', pk)
+
+
+def remember_validators(request, dataset):
+    """
+    Store what a dataset's ETag derives from.
+
+    Datasets never change after ingest, so this is kept under the user's
+    version like any cached response and outlives a single request. Only
+    requests that already read that version (cached or conditional
+    actions) store it; others would pay a query for nothing.
+    """
+    if not response_cache.knows_user_version(request):
+        return
+    response_cache.backend.set(
+        validators_key(request, dataset.pk),
+        (dataset.uploaded_at, dataset.content_hash),
+        response_cache.timeout
+    )
+
+
+def dataset_etag(view, request, pk, lookup=True):
+    """
+    ETag of one of the user's datasets.
+
+    None when the dataset is not theirs, or when it has not been seen yet
+    and lookup is false.
+    """
+    validators = response_cache.backend.get(validators_key(request, pk))
+    if validators is None:
+        if not lookup:
+            return None
+        validators = view.get_queryset().order_by().filter(pk=pk).values_list(
+            'uploaded_at', 'content_hash'
+        ).first()
+        if validators is None:
+            return None
+        response_cache.backend.set(validators_key(request, pk), validators, response_cache.timeout)
+    uploaded_at, content_hash = validators
+    # Strong: one representation per URL and dataset/layout version
+    identity = ':'.join([
+        request.get_full_path(), str(pk), uploaded_at.isoformat(), content_hash,
+        str(STATS_VERSION), str(REPORT_VERSION),
+    ])
+    return '"%s"' % hashlib.sha256(identity.encode('utf-8')).hexdigest()[:32]
+
+
+def conditional_dataset_response(method):
+    """
+    Answer GETs of a dataset resource with 304 Not Modified when the
+    client's If-None-Match still matches, before the action itself runs.
+    200 responses carry an ETag.
+
+    There is no Last-Modified: a STATS_VERSION or REPORT_VERSION bump
+    changes the representation without touching any stored timestamp, so
+    If-Modified-Since would keep answering 304 with an outdated body.
+
+    Unconditional requests never pay for a lookup: the view's get_object
+    remembers the validators of the dataset it loads.
+    """
+    @functools.wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or not request.user.is_authenticated:
+            return method(self, request, *args, **kwargs)
+
+        pk = kwargs.get('pk')
+        etag = dataset_etag(self, request, pk, lookup='HTTP_IF_NONE_MATCH' in request.META)
+        if etag is not None:
+            not_modified = get_conditional_response(request, etag=etag)
+            if not_modified is not None:
+                not_modified['ETag'] = etag
+                return not_modified
+
+        response = method(self, request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag or dataset_etag(self, request, pk)
+        return response
+    return wrapper
@@ -0,0 +1,136 @@
+"""
+Chart-ready, downsampled views of a dataset's parameters
+"""
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from .statistics import NUMERIC_FIELDS
+
+# Increment when the payload shape changes so cached entries are ignored
+CHART_DATA_VERSION = 1
+
+DEFAULT_BINS = 20
+DEFAULT_POINTS = 500
+DEFAULT_TOP = 10
+
+TOP_FIELDS = ['id', 'equipment_name', 'equipment_type'] + NUMERIC_FIELDS
+
+
+def load_parameters(dataset):
+    """
+    Read every row's id and parameters into one structured array, in the
+    (equipment_name, id) order used by the equipment listing
+    """
+    dtype = np.dtype([('id', 'i8')] + [(field, 'f8') for field in NUMERIC_FIELDS])
+    rows = (
+        dataset.equipment.order_by('equipment_name', 'id')
+        .values_list('id', *NUMERIC_FIELDS)
+        .iterator(chunk_size=getattr(settings, 'EXPORT_CHUNK_SIZE', 2000))
+    )
+    return np.fromiter(rows, dtype=dtype)
+
+
+def lttb(y, threshold):
+    """
+    Indexes of at most threshold points of y picked by
+    Largest-Triangle-Three-Buckets, with row position as x.
+
+    The first and last points are always kept; every bucket in between
+    keeps the point forming the largest triangle with the previously kept
+    point and the average of the next bucket.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.arange(n, dtype='f8')
+    # threshold - 2 buckets over the interior points 1..n-2, in integer
+    # arithmetic so bucket boundaries are exact
+    edges = 1 + np.arange(threshold - 1) * (n - 2) // (threshold - 2)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = x[end:edges[i + 2]].mean()
+            next_y = y[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        areas = np.abs(
+            (x[a] - next_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (next_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    return selected
+
+
+def top_indexes(values, n):
+    """
+    Indexes of the n largest values, largest first
+    """
+    if n >= len(values):
+        candidates = np.arange(len(values))
+    else:
+        candidates = np.argpartition(values, len(values) - n)[-n:]
+    return candidates[np.argsort(-values[candidates], kind='stable')]
+
+
+def build_chart_data(dataset, bins=DEFAULT_BINS, points=DEFAULT_POINTS, top=DEFAULT_TOP):
+    """
+    Histogram, decimated series and top-N rows of every parameter.
+
+    The payload size depends only on bins, points and top, never on the
+    number of rows in the dataset.
+    """
+    rows = load_parameters(dataset)
+
+    parameters = {}
+    top_ids = set()
+    for field in NUMERIC_FIELDS:
+        values = rows[field]
+        counts, edges = np.histogram(values, bins=bins)
+        keep = lttb(values, points)
+        leaders = rows['id'][top_indexes(values, top)].tolist()
+        top_ids.update(leaders)
+        parameters[field] = {
+            'histogram': {'edges': edges.tolist(), 'counts': counts.tolist()},
+            'series': {'x': keep.tolist(), 'y': values[keep].tolist()},
+            'top': leaders,
+        }
+
+    # One query for the rows of every top-N list
+    details = {
+        row['id']: row
+        for row in dataset.equipment.filter(id__in=top_ids).values(*TOP_FIELDS)
+    }
+    for values in parameters.values():
+        values['top'] = [details[pk] for pk in values['top']]
+
+    return {
+        'dataset_id': dataset.id,
+        'total_count': len(rows),
+        'bins': bins,
+        'points': points,
+        'top': top,
+        'parameters': parameters,
+    }
+
+
+def chart_data_key(dataset, bins, points, top):
+    stamp = f'{dataset.uploaded_at.timestamp()}:{dataset.content_hash}'
+    return f'chart_data:{CHART_DATA_VERSION}:{dataset.id}:{stamp}:{bins}:{points}:{top}'
+
+
+def get_chart_data(dataset, bins=DEFAULT_BINS, points=DEFAULT_POINTS, top=DEFAULT_TOP):
+    """
+    Return the dataset's chart data from the cache, building it on a miss
+    """
+    key = chart_data_key(dataset, bins, points, top)
+    data = cache.get(key)
+    if data is None:
+        data = build_chart_data(dataset, bins, points, top)
+        cache.set(key, data, getattr(settings, 'CHART_DATA_CACHE_TIMEOUT', 3600))
+    return data
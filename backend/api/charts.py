@@ -0,0 +1,193 @@
+"""
+Charts embedded in PDF reports, rendered headlessly and cached as PNGs
+"""
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.util import Finalize
+from django.conf import settings
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from .statistics import NUMERIC_FIELDS, bin_edges, get_statistics, histogram
+from .workers import init_report_worker
+
+# Same palette as the desktop ChartWidget
+COLORS = ['#3f51b5', '#667eea', '#ff4081', '#4caf50', '#ff9800', '#9c27b0', '#00bcd4', '#ffeb3b']
+
+PARAMETER_LABELS = {
+    'flowrate': 'Flowrate (L/min)',
+    'pressure': 'Pressure (bar)',
+    'temperature': 'Temperature (°C)',
+}
+
+HISTOGRAM_BINS = 20
+CHART_DPI = 150
+
+_chart_executor = None
+_chart_executor_lock = threading.Lock()
+
+# Report order; every chart is cached as its own PNG
+CHART_NAMES = (
+    ['type_distribution']
+    + [f'{field}_histogram' for field in NUMERIC_FIELDS]
+    + ['type_comparison']
+)
+
+# Figure sizes in inches, also used as the size embedded in the PDF
+CHART_SIZES = {
+    'type_distribution': (6, 4),
+    'type_comparison': (6.5, 3.5),
+}
+HISTOGRAM_SIZE = (6.5, 2.6)
+
+
+def chart_size(name):
+    return CHART_SIZES.get(name, HISTOGRAM_SIZE)
+
+
+def draw_no_data(ax, title):
+    ax.text(0.5, 0.5, 'No data', ha='center', va='center', transform=ax.transAxes)
+    ax.set_title(title, fontsize=12, fontweight='bold')
+    ax.set_axis_off()
+
+
+def draw_type_distribution(ax, distribution):
+    if not distribution:
+        return draw_no_data(ax, 'Equipment Type Distribution')
+    labels = [row['type'] for row in distribution]
+    values = [row['count'] for row in distribution]
+    ax.pie(values, labels=labels, autopct='%1.1f%%',
+           colors=COLORS[:len(labels)], startangle=90)
+    ax.set_title('Equipment Type Distribution', fontsize=14, fontweight='bold')
+
+
+def draw_histogram(ax, field, low, high, counts):
+    if not any(counts):
+        return draw_no_data(ax, f'{PARAMETER_LABELS[field]} Distribution')
+    edges = bin_edges(low, high, len(counts))
+    ax.bar(edges[:-1], counts, width=edges[1] - edges[0], align='edge',
+           color='#3f51b5', alpha=0.8, edgecolor='white')
+    ax.set_title(f'{PARAMETER_LABELS[field]} Distribution', fontsize=12, fontweight='bold')
+    ax.set_xlabel(PARAMETER_LABELS[field])
+    ax.set_ylabel('Equipment')
+    ax.grid(axis='y', alpha=0.3)
+
+
+def draw_type_comparison(ax, type_statistics):
+    if not type_statistics:
+        return draw_no_data(ax, 'Average Parameters by Equipment Type')
+    types = [row['type'] for row in type_statistics]
+    width = 0.8 / len(NUMERIC_FIELDS)
+    for i, field in enumerate(NUMERIC_FIELDS):
+        positions = [t + (i - (len(NUMERIC_FIELDS) - 1) / 2) * width for t in range(len(types))]
+        means = [row[field]['mean'] for row in type_statistics]
+        ax.bar(positions, means, width=width, label=PARAMETER_LABELS[field],
+               color=COLORS[i], alpha=0.8)
+    ax.set_xticks(range(len(types)))
+    # Rotate labels if too many
+    if len(types) > 5:
+        ax.set_xticklabels(types, rotation=45, ha='right')
+    else:
+        ax.set_xticklabels(types)
+    ax.set_title('Average Parameters by Equipment Type', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Average')
+    ax.grid(axis='y', alpha=0.3)
+    ax.legend(fontsize=8, loc='upper left', bbox_to_anchor=(1, 1))
+
+
+def chart_inputs(dataset, names):
+    """
+    Query everything the requested charts plot, as (draw, args) per name.
+
+    Runs in the calling process so chart rendering needs no DB connection.
+    """
+    statistics = get_statistics(dataset)
+    inputs = {}
+    for name in names:
+        if name == 'type_distribution':
+            inputs[name] = (draw_type_distribution, (statistics.type_distribution,))
+        elif name == 'type_comparison':
+            inputs[name] = (draw_type_comparison, (statistics.type_statistics,))
+        else:
+            field = name[:-len('_histogram')]
+            low = statistics.parameters[field]['min']
+            high = statistics.parameters[field]['max']
+            counts = histogram(dataset, field, low, high, HISTOGRAM_BINS)
+            inputs[name] = (draw_histogram, (field, low, high, counts))
+    return inputs
+
+
+def render_chart(path, size, draw, args):
+    """
+    Draw one chart on its own Agg figure and save it atomically as a PNG
+    """
+    figure = Figure(figsize=size)
+    FigureCanvasAgg(figure)
+    draw(figure.add_subplot(111), *args)
+    figure.tight_layout()
+
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            figure.savefig(tmp, format='png', dpi=CHART_DPI)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return path
+
+
+def get_chart_executor():
+    """
+    Return this process's chart rendering pool, creating it on first use.
+
+    Agg rendering holds the GIL, so charts are drawn in CHART_WORKERS
+    spawned processes to actually run side by side.
+    """
+    global _chart_executor
+    with _chart_executor_lock:
+        if _chart_executor is None:
+            _chart_executor = ProcessPoolExecutor(
+                max_workers=settings.CHART_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_report_worker,
+                initargs=(os.environ['DJANGO_SETTINGS_MODULE'],)
+            )
+            # Inside a report worker, threading and atexit hooks never run;
+            # shut the pool down before multiprocessing joins its children.
+            # Queue feeder threads stop at exitpriority 10, so go first.
+            Finalize(_chart_executor, _chart_executor.shutdown, exitpriority=100)
+    return _chart_executor
+
+
+def get_or_render_charts(dataset, paths):
+    """
+    Return [(name, path)] for every report chart, rendering missing ones.
+
+    paths maps chart names to their cache files. Missing charts are drawn
+    in parallel on the chart pool, or in-line when CHART_WORKERS is 0.
+    """
+    global _chart_executor
+    missing = [name for name in CHART_NAMES if not paths[name].exists()]
+    if missing:
+        paths[missing[0]].parent.mkdir(parents=True, exist_ok=True)
+        inputs = chart_inputs(dataset, missing)
+        charts = [(paths[name], chart_size(name), *inputs[name]) for name in missing]
+
+        if settings.CHART_WORKERS <= 0 or len(charts) == 1:
+            for chart in charts:
+                render_chart(*chart)
+        else:
+            executor = get_chart_executor()
+            try:
+                for future in [executor.submit(render_chart, *chart) for chart in charts]:
+                    future.result()
+            except BrokenProcessPool:
+                # Start a fresh pool for the next report
+                with _chart_executor_lock:
+                    _chart_executor = None
+                raise
+    return [(name, paths[name]) for name in CHART_NAMES]
@@ -0,0 +1,80 @@
+"""
+Side-by-side comparison of several datasets' precomputed statistics
+"""
+from .statistics import NUMERIC_FIELDS, get_statistics
+
+COMPARED_STATISTICS = ['mean', 'median', 'std', 'min', 'max']
+COMPARED_TYPE_STATISTICS = ['mean', 'std']
+
+
+def delta(value, baseline):
+    """
+    A value with its change from the baseline dataset's value
+    """
+    if value is None or baseline is None:
+        return {'value': value, 'delta': None, 'percent': None}
+    change = value - baseline
+    return {
+        'value': round(value, 2),
+        'delta': round(change, 2),
+        'percent': round(change / baseline * 100, 2) if baseline else None,
+    }
+
+
+def aligned(values):
+    # values[0] is the baseline; every entry is compared against it
+    return [delta(value, values[0]) for value in values]
+
+
+def compare_datasets(datasets):
+    """
+    Align the statistics of datasets, the first being the baseline.
+
+    Only the stored DatasetStatistics rows are read, so the cost does not
+    depend on how many equipment rows the datasets hold.
+    """
+    statistics = [get_statistics(dataset) for dataset in datasets]
+
+    parameters = {
+        field: {
+            key: aligned([stats.parameters[field][key] for stats in statistics])
+            for key in COMPARED_STATISTICS
+        }
+        for field in NUMERIC_FIELDS
+    }
+
+    by_type = [
+        {row['type']: row for row in stats.type_statistics}
+        for stats in statistics
+    ]
+    types = sorted(set().union(*by_type))
+    type_rows = []
+    for eq_type in types:
+        rows = [rows.get(eq_type) for rows in by_type]
+        type_rows.append({
+            'type': eq_type,
+            'count': aligned([row['count'] if row else None for row in rows]),
+            **{
+                field: {
+                    key: aligned([row[field][key] if row else None for row in rows])
+                    for key in COMPARED_TYPE_STATISTICS
+                }
+                for field in NUMERIC_FIELDS
+            },
+        })
+
+    return {
+        'baseline': datasets[0].id,
+        'datasets': [
+            {
+                'id': dataset.id,
+                'name': dataset.name,
+                'uploaded_at': dataset.uploaded_at,
+                'total_count': dataset.total_count,
+            }
+            for dataset in datasets
+        ],
+        'total_count': aligned([dataset.total_count for dataset in datasets]),
+        'parameters': parameters,
+        'types': type_rows,
+    }
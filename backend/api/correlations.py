@@ -0,0 +1,116 @@
+"""
+Correlation matrices and linear fits between a dataset's parameters
+"""
+import math
+from itertools import permutations
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from .statistics import NUMERIC_FIELDS
+
+
+def load_columns(dataset):
+    """
+    Read the type and parameter columns of every row into a DataFrame
+    """
+    columns = ['equipment_type'] + NUMERIC_FIELDS
+    rows = dataset.equipment.values_list(*columns).iterator(
+        chunk_size=getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+    )
+    return pd.DataFrame.from_records(rows, columns=columns)
+
+
+def rank(values):
+    """
+    Ranks starting at 1, ties sharing their average rank (as Spearman needs)
+    """
+    order = np.argsort(values, kind='stable')
+    ordered = values[order]
+    starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+    ends = np.r_[starts[1:], len(values)]
+    group = np.repeat(np.arange(len(starts)), ends - starts)
+    ranks = np.empty(len(values))
+    ranks[order] = ((starts + ends + 1) / 2)[group]
+    return ranks
+
+
+def finite(value, digits=4):
+    # Constant columns have no correlation; JSON has no NaN
+    return round(float(value), digits) if math.isfinite(value) else None
+
+
+def correlation_matrix(matrix):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        coefficients = np.atleast_2d(np.corrcoef(matrix, rowvar=False))
+    return [[finite(value) for value in row] for row in coefficients]
+
+
+def linear_fits(matrix):
+    """
+    Least-squares y = slope * x + intercept for every ordered parameter pair
+    """
+    means = matrix.mean(axis=0)
+    centered = matrix - means
+    covariance = centered.T @ centered
+    fits = []
+    for i, j in permutations(range(len(NUMERIC_FIELDS)), 2):
+        if covariance[i, i] == 0:
+            slope = intercept = r_squared = math.nan
+        else:
+            slope = covariance[i, j] / covariance[i, i]
+            intercept = means[j] - slope * means[i]
+            r_squared = (
+                covariance[i, j] ** 2 / (covariance[i, i] * covariance[j, j])
+                if covariance[j, j] else math.nan
+            )
+        fits.append({
+            'x': NUMERIC_FIELDS[i],
+            'y': NUMERIC_FIELDS[j],
+            'slope': finite(slope),
+            'intercept': finite(intercept),
+            'r_squared': finite(r_squared),
+        })
+    return fits
+
+
+def correlate(matrix):
+    """
+    Pearson and Spearman matrices plus linear fits for an (n, fields) array
+    """
+    if len(matrix) < 2:
+        return {'count': len(matrix), 'pearson': None, 'spearman': None, 'fits': []}
+    ranks = np.column_stack([rank(column) for column in matrix.T])
+    return {
+        'count': len(matrix),
+        'pearson': correlation_matrix(matrix),
+        'spearman': correlation_matrix(ranks),
+        'fits': linear_fits(matrix),
+    }
+
+
+def build_correlations(dataset):
+    """
+    Correlations over the whole dataset and within each equipment type
+    """
+    frame = load_columns(dataset)
+    matrix = frame[NUMERIC_FIELDS].to_numpy(dtype='float64')
+    by_type = frame.groupby('equipment_type', sort=True).indices
+    return {
+        'fields': NUMERIC_FIELDS,
+        'overall': correlate(matrix),
+        'by_type': [
+            {'type': eq_type, **correlate(matrix[indexes])}
+            for eq_type, indexes in by_type.items()
+        ],
+    }
+
+
+def get_correlations(dataset, statistics):
+    """
+    Return the correlations stored with a dataset's statistics, computing
+    them on first use
+    """
+    if not statistics.correlations:
+        statistics.correlations = build_correlations(dataset)
+        statistics.save(update_fields=['correlations'])
+    return statistics.correlations
@@ -0,0 +1,146 @@
+"""
+Equipment-level differences between two datasets
+"""
+from collections.abc import Sequence
+from itertools import chain
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.cache import cache
+from .exports import EXPORT_FIELDS, iter_row_chunks
+from .statistics import NUMERIC_FIELDS
+
+# Increment when the diff frame's shape changes so cached entries are ignored
+DIFF_VERSION = 2
+
+DIFF_STATUSES = ['added', 'removed', 'changed']
+
+
+def load_frame(dataset):
+    """
+    Every row's name, type and parameters as columns, in (name, id) order,
+    plus the occurrence number of repeated names
+    """
+    frame = pd.DataFrame.from_records(
+        chain.from_iterable(iter_row_chunks(dataset)), columns=EXPORT_FIELDS
+    )
+    # Rows arrive sorted by name, so a repeated name's occurrence number is
+    # its distance from the first row of its run
+    names = frame['equipment_name'].to_numpy()
+    position = np.arange(len(names))
+    run_start = np.r_[True, names[1:] != names[:-1]] if len(names) else np.zeros(0, dtype=bool)
+    occurrence = position - np.maximum.accumulate(np.where(run_start, position, 0))
+    frame['occurrence'] = occurrence
+    return frame
+
+
+def diff_frames(before, after, threshold=0.0):
+    """
+    Hash-join two row frames on (equipment_name, occurrence).
+
+    Returns one row per added, removed or changed piece of equipment with
+    before/after columns and a status. A matched row counts as changed when
+    its type differs or any parameter moved by more than threshold. Deltas
+    are left to diff_record so the (cached) frame stays small.
+    """
+    keys = ['equipment_name', 'occurrence']
+    if not (before['occurrence'].any() or after['occurrence'].any()):
+        # No repeated names: hashing the name column alone is much cheaper
+        keys = ['equipment_name']
+        before = before.drop(columns='occurrence')
+        after = after.drop(columns='occurrence')
+    merged = before.merge(
+        after, on=keys, how='outer',
+        suffixes=('_before', '_after'), indicator=True, sort=False
+    )
+    if 'occurrence' not in keys:
+        merged['occurrence'] = 0
+    for field in NUMERIC_FIELDS:
+        merged[f'{field}_delta'] = merged[f'{field}_after'] - merged[f'{field}_before']
+
+    matched = (merged['_merge'] == 'both').to_numpy()
+    deltas = merged[[f'{field}_delta' for field in NUMERIC_FIELDS]].to_numpy()
+    moved = (np.abs(np.nan_to_num(deltas)) > threshold).any(axis=1)
+    retyped = (merged['equipment_type_before'] != merged['equipment_type_after']).to_numpy()
+    status = np.select(
+        [merged['_merge'] == 'left_only', merged['_merge'] == 'right_only', matched & (moved | retyped)],
+        ['removed', 'added', 'changed'],
+        default=''
+    )
+
+    merged['status'] = status
+    diff = merged[status != ''].sort_values(['status', 'equipment_name', 'occurrence'], kind='stable')
+    diff = diff.drop(columns=['_merge', 'occurrence', *(f'{field}_delta' for field in NUMERIC_FIELDS)])
+    # Few distinct statuses and types: categories pickle far smaller
+    categorical = ['status', 'equipment_type_before', 'equipment_type_after']
+    return diff.astype({column: 'category' for column in categorical}).reset_index(drop=True)
+
+
+def parameters(row, suffix):
+    if pd.isna(row[f'{NUMERIC_FIELDS[0]}_{suffix}']):
+        return None
+    return {field: round(float(row[f'{field}_{suffix}']), 4) for field in NUMERIC_FIELDS}
+
+
+def diff_record(row):
+    before = parameters(row, 'before')
+    after = parameters(row, 'after')
+    return {
+        'equipment_name': row['equipment_name'],
+        'status': row['status'],
+        'equipment_type': row['equipment_type_after'] if after else row['equipment_type_before'],
+        'previous_type': row['equipment_type_before'] if before and after else None,
+        'before': before,
+        'after': after,
+        'deltas': (
+            {field: round(float(row[f'{field}_after'] - row[f'{field}_before']), 4) for field in NUMERIC_FIELDS}
+            if before and after else None
+        ),
+    }
+
+
+class DiffRows(Sequence):
+    """
+    Read-only view of a diff frame that builds records only for the rows
+    actually sliced out, so paginating never converts the whole frame
+    """
+
+    def __init__(self, frame):
+        self.frame = frame
+
+    def __len__(self):
+        return len(self.frame)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [diff_record(row) for _, row in self.frame.iloc[index].iterrows()]
+        return diff_record(self.frame.iloc[index])
+
+
+def diff_key(dataset, other, threshold):
+    stamps = [f'{ds.id}:{ds.uploaded_at.timestamp()}:{ds.content_hash}' for ds in (dataset, other)]
+    return f'dataset_diff:{DIFF_VERSION}:{stamps[0]}:{stamps[1]}:{threshold}'
+
+
+def get_diff(dataset, other, threshold=0.0):
+    """
+    Return the diff frame from dataset to other, from the cache if possible.
+
+    Diffs longer than DIFF_CACHE_MAX_ROWS are recomputed on every request
+    rather than stored as multi-megabyte cache entries.
+    """
+    key = diff_key(dataset, other, threshold)
+    diff = cache.get(key)
+    if diff is None:
+        diff = diff_frames(load_frame(dataset), load_frame(other), threshold)
+        if len(diff) <= getattr(settings, 'DIFF_CACHE_MAX_ROWS', 5000):
+            cache.set(key, diff, getattr(settings, 'DIFF_CACHE_TIMEOUT', 3600))
+    return diff
+
+
+def diff_counts(diff, other):
+    counts = diff['status'].value_counts()
+    result = {status: int(counts.get(status, 0)) for status in DIFF_STATUSES}
+    # Every matched row that is not changed is unchanged
+    result['unchanged'] = other.total_count - result['added'] - result['changed']
+    return result
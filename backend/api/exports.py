@@ -0,0 +1,131 @@
+"""
+Streaming exports of a dataset's equipment rows
+"""
+import csv
+import io
+import json
+from django.conf import settings
+from .reports import ZipStreamBuffer
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional; only the Arrow and Parquet exports need it
+    pa = pq = None
+
+
+EXPORT_FIELDS = ['equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature']
+# Same header as the upload format, so an export can be re-uploaded as is
+CSV_HEADER = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
+
+
+def iter_row_chunks(dataset, chunk_size=None):
+    """
+    Yield lists of value tuples read through a server-side cursor
+    """
+    chunk_size = chunk_size or getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+    rows = (
+        dataset.equipment.order_by('equipment_name', 'id')
+        .values_list(*EXPORT_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def stream_csv(dataset, chunk_size=None):
+    """
+    Yield the dataset as CSV text, one chunk of rows at a time
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+    for chunk in iter_row_chunks(dataset, chunk_size):
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_ndjson(dataset, chunk_size=None):
+    """
+    Yield the dataset as newline-delimited JSON objects
+    """
+    for chunk in iter_row_chunks(dataset, chunk_size):
+        yield ''.join(
+            json.dumps(dict(zip(EXPORT_FIELDS, row))) + '\n' for row in chunk
+        )
+
+
+def arrow_schema():
+    return pa.schema([
+        ('equipment_name', pa.string()),
+        # Few distinct types, so they are sent once per stream
+        ('equipment_type', pa.dictionary(pa.int32(), pa.string())),
+        ('flowrate', pa.float64()),
+        ('pressure', pa.float64()),
+        ('temperature', pa.float64()),
+    ])
+
+
+def iter_record_batches(dataset, chunk_size=None):
+    """
+    Yield the rows as Arrow record batches of chunk_size rows.
+
+    equipment_type is dictionary-encoded from each batch's own values, so
+    a row never depends on the type list recorded at ingest.
+    """
+    schema = arrow_schema()
+    chunk_size = chunk_size or getattr(settings, 'ARROW_BATCH_SIZE', 65536)
+    for chunk in iter_row_chunks(dataset, chunk_size):
+        names, row_types, flowrates, pressures, temperatures = zip(*chunk)
+        yield pa.record_batch([
+            pa.array(names, type=pa.string()),
+            pa.array(row_types, type=pa.string()).dictionary_encode(),
+            pa.array(flowrates, type=pa.float64()),
+            pa.array(pressures, type=pa.float64()),
+            pa.array(temperatures, type=pa.float64()),
+        ], schema=schema)
+
+
+def stream_arrow(dataset, chunk_size=None):
+    """
+    Yield the dataset in the Arrow IPC streaming format
+    """
+    buffer = ZipStreamBuffer()
+    with pa.ipc.new_stream(buffer, arrow_schema()) as writer:
+        for batch in iter_record_batches(dataset, chunk_size):
+            writer.write_batch(batch)
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+def stream_parquet(dataset, chunk_size=None):
+    """
+    Yield the dataset as a Parquet file, one row group per batch
+    """
+    buffer = ZipStreamBuffer()
+    with pq.ParquetWriter(buffer, arrow_schema(), compression='snappy') as writer:
+        for batch in iter_record_batches(dataset, chunk_size):
+            writer.write_batch(batch)
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+EXPORT_STREAMS = {
+    'csv': stream_csv,
+    'ndjson': stream_ndjson,
+    'arrow': stream_arrow,
+    'parquet': stream_parquet,
+}
+
+# Formats that cannot be produced without an optional dependency
+ARROW_FORMATS = ('arrow', 'parquet')
@@ -0,0 +1,219 @@
+"""
+Columnar CSV ingest engine for equipment datasets
+"""
+from collections import Counter
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+from .models import EquipmentData
+from .statistics import build_statistics
+from .trends import record_trend_point
+from .utils import validate_csv_columns
+
+
+# CSV header -> EquipmentData field
+COLUMN_MAP = {
+    'Equipment Name': 'equipment_name',
+    'Type': 'equipment_type',
+    'Flowrate': 'flowrate',
+    'Pressure': 'pressure',
+    'Temperature': 'temperature',
+}
+REQUIRED_COLUMNS = list(COLUMN_MAP)
+EQUIPMENT_FIELDS = list(COLUMN_MAP.values())
+NUMERIC_FIELDS = ['flowrate', 'pressure', 'temperature']
+
+
+class RunningStats:
+    """
+    Mergeable count/mean/variance/min/max accumulator.
+
+    Each chunk is reduced with NumPy and folded in with Chan's parallel
+    update, so memory stays constant regardless of how many rows are seen.
+    """
+
+    def __init__(self, fields):
+        self.fields = list(fields)
+        size = len(self.fields)
+        self.count = 0
+        self.mean = np.zeros(size)
+        self.m2 = np.zeros(size)
+        self.min = np.full(size, np.inf)
+        self.max = np.full(size, -np.inf)
+
+    def update(self, frame):
+        values = frame[self.fields].to_numpy(dtype='float64')
+        n = len(values)
+        if not n:
+            return
+        mean = values.mean(axis=0)
+        m2 = ((values - mean) ** 2).sum(axis=0)
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (n / total)
+        self.m2 = self.m2 + m2 + delta ** 2 * (self.count * n / total)
+        self.count = total
+        self.min = np.minimum(self.min, values.min(axis=0))
+        self.max = np.maximum(self.max, values.max(axis=0))
+
+    def std(self):
+        if self.count < 2:
+            return np.zeros(len(self.fields))
+        return np.sqrt(self.m2 / (self.count - 1))
+
+    def as_dict(self):
+        empty = self.count == 0
+        std = self.std()
+        return {
+            field: {
+                'count': self.count,
+                'mean': 0.0 if empty else float(self.mean[i]),
+                'min': 0.0 if empty else float(self.min[i]),
+                'max': 0.0 if empty else float(self.max[i]),
+                'std': float(std[i]),
+            }
+            for i, field in enumerate(self.fields)
+        }
+
+
+def validate_csv_header(source):
+    """
+    Check the required columns from the header line only, then rewind
+    """
+    validate_csv_columns(pd.read_csv(source, nrows=0), REQUIRED_COLUMNS)
+    source.seek(0)
+
+
+def read_csv_chunks(source, chunksize=None):
+    """
+    Yield prepared frames of at most INGEST_CHUNK_SIZE rows
+    """
+    chunksize = chunksize or getattr(settings, 'INGEST_CHUNK_SIZE', 50000)
+    reader = pd.read_csv(
+        source,
+        usecols=REQUIRED_COLUMNS,
+        dtype={'Equipment Name': str, 'Type': str},
+        chunksize=chunksize
+    )
+    with reader:
+        for chunk in reader:
+            yield prepare_frame(chunk)
+
+
+def prepare_frame(df):
+    """
+    Validate and convert a raw CSV DataFrame one whole column at a time.
+
+    Returns a DataFrame whose columns are the EquipmentData field names.
+    Raises ValueError for missing columns, blank names or types, or
+    non-numeric or non-finite parameter values.
+    """
+    validate_csv_columns(df, REQUIRED_COLUMNS)
+    frame = df[REQUIRED_COLUMNS].rename(columns=COLUMN_MAP)
+
+    for field in ('equipment_name', 'equipment_type'):
+        values = frame[field].astype(str)
+        # Blank cells read as NaN; astype(str) would store them as 'nan'
+        missing = frame[field].isna() | (values.str.strip() == '')
+        if missing.any():
+            raise ValueError(
+                f"Missing {field} value on line(s) {csv_lines(frame.index[missing])}"
+            )
+        frame[field] = values
+
+    for field in NUMERIC_FIELDS:
+        values = pd.to_numeric(frame[field], errors='coerce')
+        # NaN for non-numeric text; 'inf' and overflowing numbers parse too
+        invalid = ~np.isfinite(values.to_numpy(dtype='float64'))
+        if invalid.any():
+            raise ValueError(
+                f"Invalid {field} value on line(s) {csv_lines(frame.index[invalid])}"
+            )
+        frame[field] = values.astype('float64')
+
+    return frame
+
+
+def csv_lines(index):
+    # +2: one for the header line, one because CSV lines start at 1
+    return ', '.join(str(i + 2) for i in index[:5])
+
+
+def insert_equipment(dataset, frame, batch_size=None):
+    """
+    Insert the rows of a prepared frame in bounded bulk_create batches
+    """
+    batch_size = batch_size or getattr(settings, 'INGEST_BATCH_SIZE', 2000)
+    for start in range(0, len(frame), batch_size):
+        batch = frame.iloc[start:start + batch_size][EQUIPMENT_FIELDS]
+        EquipmentData.objects.bulk_create([
+            EquipmentData(
+                dataset_id=dataset.id,
+                equipment_name=name,
+                equipment_type=eq_type,
+                flowrate=flowrate,
+                pressure=pressure,
+                temperature=temperature
+            )
+            for name, eq_type, flowrate, pressure, temperature
+            in batch.itertuples(index=False, name=None)
+        ], batch_size=batch_size)
+
+
+def ingest_frames(dataset, frames, batch_size=None, progress=None):
+    """
+    Store prepared frames on a dataset while keeping running statistics.
+
+    Only one frame is held at a time, so memory is bounded by the chunk
+    size rather than the file size. Each chunk commits on its own; the
+    dataset stays hidden (is_ready=False) until the final save flips it.
+    progress, if given, is called with the running row count per chunk.
+    """
+    stats = RunningStats(NUMERIC_FIELDS)
+    type_counts = Counter()
+
+    for frame in frames:
+        with transaction.atomic():
+            insert_equipment(dataset, frame, batch_size)
+        stats.update(frame)
+        type_counts.update(frame['equipment_type'].value_counts().to_dict())
+        if progress:
+            progress(stats.count)
+
+    parameters = stats.as_dict()
+    dataset.total_count = stats.count
+    dataset.avg_flowrate = parameters['flowrate']['mean']
+    dataset.avg_pressure = parameters['pressure']['mean']
+    dataset.avg_temperature = parameters['temperature']['mean']
+    dataset.equipment_types = {
+        str(eq_type): int(count) for eq_type, count in type_counts.items()
+    }
+    dataset.is_ready = True
+    with transaction.atomic():
+        statistics = build_statistics(dataset, parameters)
+        record_trend_point(dataset, statistics)
+        dataset.save()
+    return dataset
+
+
+def ingest_frame(dataset, frame, batch_size=None):
+    """
+    Store a single prepared frame on a dataset
+    """
+    return ingest_frames(dataset, [frame], batch_size)
+
+
+def ingest_csv(dataset, source, chunksize=None, batch_size=None, progress=None):
+    """
+    Stream a CSV file into a dataset chunk by chunk.
+
+    progress, if given, is called with (rows_processed, bytes_processed).
+    """
+    on_chunk = None
+    if progress:
+        def on_chunk(rows):
+            progress(rows, source.tell())
+    return ingest_frames(
+        dataset, read_csv_chunks(source, chunksize), batch_size, on_chunk
+    )
@@ -0,0 +1,324 @@
+"""
+Local background worker pools for ingest and report jobs
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from datetime import timedelta
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+from .ingest import ingest_csv
+from .models import Dataset, IngestJob, ReportJob
+from .reports import get_or_build_report
+from .workers import init_report_worker
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+_report_executor = None
+_report_executor_lock = threading.Lock()
+
+
+def get_ingest_executor():
+    """
+    Return the process-wide ingest thread pool, creating it on first use
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.INGEST_WORKERS,
+                thread_name_prefix='ingest'
+            )
+    return _executor
+
+
+def fail_stale_ingest_jobs(timeout=None):
+    """
+    Fail active ingest jobs whose heartbeat is older than timeout seconds
+    (INGEST_JOB_TIMEOUT by default; 0 fails every active job) and delete
+    their unfinished datasets and stored files.
+
+    The ingest queue only lives in its server process, so a restart (or
+    an on_commit hook that never ran) leaves jobs nobody will pick up.
+    """
+    if timeout is None:
+        timeout = getattr(settings, 'INGEST_JOB_TIMEOUT', 1800)
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    stale = IngestJob.objects.filter(
+        status__in=IngestJob.ACTIVE_STATUSES, updated_at__lt=cutoff
+    ).select_related('dataset')
+    failed = 0
+    for job in stale:
+        # Conditional, so a worker that just reported progress keeps its job
+        claimed = IngestJob.objects.filter(
+            pk=job.pk, status__in=IngestJob.ACTIVE_STATUSES, updated_at__lt=cutoff
+        ).update(
+            status=IngestJob.STATUS_FAILED,
+            error='Ingest stopped before finishing; please upload the file again',
+            finished_at=timezone.now(),
+            updated_at=timezone.now()
+        )
+        if claimed and job.dataset is not None and not job.dataset.is_ready:
+            job.dataset.file.delete(save=False)
+            job.dataset.delete()
+        failed += claimed
+    if failed:
+        logger.warning('Failed %s stale ingest job(s)', failed)
+    return failed
+
+
+def submit_ingest_job(job):
+    """
+    Queue an ingest job, or run it inline when INGEST_WORKERS is 0
+    """
+    if getattr(settings, 'INGEST_WORKERS', 0) <= 0:
+        run_ingest_job(job.pk)
+        job.refresh_from_db()
+        return job
+
+    # Only hand the job to a worker once its row is visible to other connections
+    transaction.on_commit(
+        lambda: get_ingest_executor().submit(_run_in_worker, job.pk)
+    )
+    return job
+
+
+def _run_in_worker(job_id):
+    try:
+        run_ingest_job(job_id)
+    finally:
+        # Worker threads hold their own connections; don't leak them
+        connections.close_all()
+
+
+def run_ingest_job(job_id):
+    """
+    Ingest the stored CSV of a job's dataset and record the outcome
+    """
+    job = IngestJob.objects.select_related('dataset').get(pk=job_id)
+    dataset = job.dataset
+
+    # A job failed as stale while queued has already lost its dataset
+    if not IngestJob.objects.filter(pk=job_id, status=IngestJob.STATUS_PENDING).update(
+        status=IngestJob.STATUS_RUNNING, started_at=timezone.now(), updated_at=timezone.now()
+    ):
+        return
+
+    def report_progress(rows, position):
+        IngestJob.objects.filter(pk=job_id).update(
+            rows_processed=rows, bytes_processed=position, updated_at=timezone.now()
+        )
+
+    try:
+        with dataset.file.open('rb') as source:
+            ingest_csv(dataset, source, progress=report_progress)
+    except Exception as e:
+        logger.warning('Ingest job %s failed: %s', job_id, e)
+        # Drop the partially ingested dataset and its stored file
+        dataset.file.delete(save=False)
+        dataset.delete()
+        IngestJob.objects.filter(pk=job_id).update(
+            status=IngestJob.STATUS_FAILED,
+            error=f'Error processing file: {str(e)}',
+            finished_at=timezone.now(),
+            updated_at=timezone.now()
+        )
+        return
+
+    IngestJob.objects.filter(pk=job_id).update(
+        status=IngestJob.STATUS_COMPLETED,
+        rows_processed=dataset.total_count,
+        bytes_processed=job.total_bytes,
+        finished_at=timezone.now(),
+        updated_at=timezone.now()
+    )
+
+
+def get_report_executor():
+    """
+    Return the process-wide report pool, creating it on first use.
+
+    ReportLab layout is CPU-bound, so reports run in REPORT_WORKERS
+    separate processes instead of request threads. Workers are spawned
+    rather than forked so they never share the parent's DB connections.
+    """
+    global _report_executor
+    with _report_executor_lock:
+        if _report_executor is None:
+            _report_executor = ProcessPoolExecutor(
+                max_workers=settings.REPORT_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_report_worker,
+                initargs=(os.environ['DJANGO_SETTINGS_MODULE'],)
+            )
+    return _report_executor
+
+
+def fail_stale_report_jobs(timeout=None):
+    """
+    Fail active report jobs whose heartbeat is older than timeout seconds
+    (REPORT_JOB_TIMEOUT by default; 0 fails every active job).
+
+    Like the ingest queue, the report pool only lives in its server
+    process; a job it lost would otherwise be reused forever.
+    """
+    if timeout is None:
+        timeout = getattr(settings, 'REPORT_JOB_TIMEOUT', 1800)
+    cutoff = timezone.now() - timedelta(seconds=timeout)
+    failed = ReportJob.objects.filter(
+        status__in=ReportJob.ACTIVE_STATUSES, updated_at__lt=cutoff
+    ).update(
+        status=ReportJob.STATUS_FAILED,
+        error='Report generation stopped before finishing; please request it again',
+        finished_at=timezone.now(),
+        updated_at=timezone.now()
+    )
+    if failed:
+        logger.warning('Failed %s stale report job(s)', failed)
+    return failed
+
+
+def submit_report_job(job):
+    """
+    Queue a report job, or build it inline when REPORT_WORKERS is 0
+    """
+    if getattr(settings, 'REPORT_WORKERS', 0) <= 0:
+        run_report_job(job.pk)
+        job.refresh_from_db()
+        return job
+
+    def enqueue():
+        future = get_report_executor().submit(_run_report_in_worker, job.pk)
+        future.add_done_callback(lambda f: _report_worker_done(f, job.pk))
+
+    transaction.on_commit(enqueue)
+    return job
+
+
+def _run_report_in_worker(job_id):
+    try:
+        run_report_job(job_id)
+    finally:
+        connections.close_all()
+
+
+def _discard_report_executor():
+    # A broken pool rejects all further work; the next caller starts a new one
+    global _report_executor
+    with _report_executor_lock:
+        _report_executor = None
+
+
+def _report_worker_done(future, job_id):
+    # A crashed worker process never records its own failure
+    error = future.exception()
+    if error is None:
+        return
+    logger.error('Report worker for job %s died: %s', job_id, error)
+    if isinstance(error, BrokenProcessPool):
+        _discard_report_executor()
+    try:
+        ReportJob.objects.filter(
+            pk=job_id, status__in=ReportJob.ACTIVE_STATUSES
+        ).update(
+            status=ReportJob.STATUS_FAILED,
+            error=f'Error generating report: {str(error)}',
+            finished_at=timezone.now(),
+            updated_at=timezone.now()
+        )
+    finally:
+        connections.close_all()
+
+
+def run_report_job(job_id):
+    """
+    Build (or reuse) the cached PDF for a report job's dataset
+    """
+    job = ReportJob.objects.select_related('dataset__user').get(pk=job_id)
+    if job.dataset is None:
+        ReportJob.objects.filter(pk=job_id).update(
+            status=ReportJob.STATUS_FAILED,
+            error='Dataset no longer exists',
+            finished_at=timezone.now(),
+            updated_at=timezone.now()
+        )
+        return
+
+    # A job failed as stale while queued has been replaced by a new one
+    if not ReportJob.objects.filter(pk=job_id, status=ReportJob.STATUS_PENDING).update(
+        status=ReportJob.STATUS_RUNNING, started_at=timezone.now(), updated_at=timezone.now()
+    ):
+        return
+    try:
+        path = get_or_build_report(job.dataset, full=job.full)
+    except Exception as e:
+        logger.exception('Report job %s failed', job_id)
+        ReportJob.objects.filter(pk=job_id).update(
+            status=ReportJob.STATUS_FAILED,
+            error=f'Error generating report: {str(e)}',
+            finished_at=timezone.now(),
+            updated_at=timezone.now()
+        )
+        return
+
+    ReportJob.objects.filter(pk=job_id).update(
+        status=ReportJob.STATUS_COMPLETED,
+        file_path=str(path),
+        finished_at=timezone.now(),
+        updated_at=timezone.now()
+    )
+
+
+def build_report(dataset_id, full=False):
+    """
+    Build (or reuse) one dataset's cached PDF and return its path
+    """
+    try:
+        dataset = Dataset.objects.select_related('user').get(pk=dataset_id)
+        return str(get_or_build_report(dataset, full=full))
+    finally:
+        connections.close_all()
+
+
+def iter_built_reports(datasets, full=False):
+    """
+    Yield (dataset, path, error) for each dataset as its PDF becomes ready.
+
+    Missing reports are built in parallel on the report pool; cached ones
+    come back almost immediately. With REPORT_WORKERS at 0 they are built
+    one after another in-line.
+    """
+    if getattr(settings, 'REPORT_WORKERS', 0) <= 0:
+        for dataset in datasets:
+            try:
+                yield dataset, get_or_build_report(dataset, full=full), None
+            except Exception as e:
+                logger.warning('Report for dataset %s failed: %s', dataset.pk, e)
+                yield dataset, None, e
+        return
+
+    executor = get_report_executor()
+    futures = {
+        executor.submit(build_report, dataset.pk, full): dataset
+        for dataset in datasets
+    }
+    try:
+        for future in as_completed(futures):
+            dataset = futures[future]
+            try:
+                yield dataset, future.result(), None
+            except Exception as e:
+                logger.warning('Report for dataset %s failed: %s', dataset.pk, e)
+                if isinstance(e, BrokenProcessPool):
+                    _discard_report_executor()
+                yield dataset, None, e
+    finally:
+        # The client may disconnect mid-stream; drop builds not yet started
+        for future in futures:
+            future.cancel()
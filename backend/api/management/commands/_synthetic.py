@@ -0,0 +1,22 @@
+"""
+Synthetic equipment data shared by the benchmark and budget commands
+"""
+import numpy as np
+import pandas as pd
+
+
+TYPES = ['Pump', 'Reactor', 'Heat Exchanger', 'Compressor', 'Valve', 'Condenser']
+
+
+def make_frame(rows, seed=0):
+    """
+    Build a synthetic CSV-shaped DataFrame
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Equipment Name': [f'Unit-{i}' for i in range(rows)],
+        'Type': rng.choice(TYPES, rows),
+        'Flowrate': rng.normal(180, 40, rows).round(1),
+        'Pressure': rng.normal(25, 8, rows).round(1),
+        'Temperature': rng.normal(90, 30, rows).round(1),
+    })
@@ -0,0 +1,71 @@
+"""
+Benchmark the CSV ingest path: legacy row loop vs columnar engine
+"""
+import time
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from api.ingest import prepare_frame, ingest_frame, insert_equipment
+from api.models import Dataset, EquipmentData
+from ._synthetic import make_frame
+
+
+def legacy_insert(dataset, df):
+    """
+    The row loop of the original DatasetViewSet.upload, kept for comparison
+    """
+    equipment_list = []
+    for _, row in df.iterrows():
+        equipment_list.append(EquipmentData(
+            dataset=dataset,
+            equipment_name=row['Equipment Name'],
+            equipment_type=row['Type'],
+            flowrate=float(row['Flowrate']),
+            pressure=float(row['Pressure']),
+            temperature=float(row['Temperature'])
+        ))
+    EquipmentData.objects.bulk_create(equipment_list)
+
+
+class Command(BaseCommand):
+    help = 'Measure ingest throughput (rows/s) of the legacy and columnar upload paths'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200000)
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--skip-legacy', action='store_true')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        batch_size = options['batch_size']
+        df = make_frame(rows)
+        self.stdout.write(f'Ingesting {rows} synthetic rows (changes are rolled back)')
+        self.stdout.write('Row insert: converting the parsed CSV frame and inserting every row')
+
+        columnar = self._run(lambda dataset: insert_equipment(dataset, prepare_frame(df), batch_size))
+        if not options['skip_legacy']:
+            legacy = self._run(lambda dataset: legacy_insert(dataset, df))
+            self._report('legacy iterrows', rows, legacy)
+            self._report('columnar', rows, columnar, f'  ({legacy / columnar:.1f}x faster)')
+        else:
+            self._report('columnar', rows, columnar)
+
+        # Not comparable with the lines above: the legacy upload had no equivalent
+        self.stdout.write('Full ingest: row insert plus statistics, anomaly flags and trend point')
+        elapsed = self._run(lambda dataset: ingest_frame(dataset, prepare_frame(df), batch_size))
+        self._report('columnar', rows, elapsed)
+
+    def _run(self, ingest):
+        with transaction.atomic():
+            user = User.objects.create(username='__benchmark_ingest__')
+            dataset = Dataset.objects.create(user=user, name='benchmark')
+            start = time.perf_counter()
+            ingest(dataset)
+            elapsed = time.perf_counter() - start
+            transaction.set_rollback(True)
+        return elapsed
+
+    def _report(self, label, rows, elapsed, suffix=''):
+        self.stdout.write(
+            f'{label:>16}: {elapsed:8.2f} s  {rows / elapsed:12,.0f} rows/s{suffix}'
+        )
@@ -0,0 +1,75 @@
+"""
+Benchmark equipment page responses: row vs columnar format, DRF vs fast JSON
+"""
+import time
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+from api.ingest import prepare_frame, ingest_frame
+from api.models import Dataset
+from api.renderers import ColumnarJSONRenderer, FastJSONRenderer, orjson
+from api.views import DatasetViewSet
+from ._synthetic import make_frame
+
+# (label, renderer classes, ?format=)
+VARIANTS = [
+    ('rows, JSONRenderer', [JSONRenderer], 'json'),
+    ('rows, FastJSONRenderer', [FastJSONRenderer], 'json'),
+    ('columnar, FastJSONRenderer', [FastJSONRenderer, ColumnarJSONRenderer], 'columnar'),
+]
+
+
+class Command(BaseCommand):
+    help = 'Measure latency and payload size of every equipment page per response format'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000)
+        parser.add_argument('--page-size', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='best of this many passes is reported')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        self.stdout.write(
+            f'Paging through {rows} synthetic rows, {options["page_size"]} per page '
+            f'(orjson {"installed" if orjson else "missing"}; changes are rolled back)'
+        )
+
+        with transaction.atomic():
+            user = User.objects.create(username='__benchmark_renderers__')
+            dataset = Dataset.objects.create(user=user, name='benchmark')
+            ingest_frame(dataset, prepare_frame(make_frame(rows)))
+
+            baseline = None
+            for label, renderer_classes, export_format in VARIANTS:
+                view = DatasetViewSet.as_view({'get': 'equipment'}, renderer_classes=renderer_classes)
+                elapsed, size = min(
+                    self._walk(view, user, dataset, export_format, options['page_size'])
+                    for _ in range(options['repeat'])
+                )
+                baseline = baseline or (elapsed, size)
+                self.stdout.write(
+                    f'{label:>28}: {elapsed:8.3f} s ({elapsed / baseline[0]:5.2f}x)  '
+                    f'{size / 2**20:8.2f} MiB ({size / baseline[1]:5.2f}x)'
+                )
+            transaction.set_rollback(True)
+
+    def _walk(self, view, user, dataset, export_format, page_size):
+        """Fetch and render every page; return (seconds, bytes)"""
+        factory = APIRequestFactory()
+        params = {'format': export_format, 'page_size': page_size}
+        elapsed = size = 0
+        while True:
+            request = factory.get(f'/api/datasets/{dataset.id}/equipment/', params)
+            force_authenticate(request, user=user)
+            start = time.perf_counter()
+            response = view(request, pk=dataset.id)
+            response.render()
+            elapsed += time.perf_counter() - start
+            size += len(response.content)
+            cursor = response.data['next_cursor']
+            if cursor is None:
+                return elapsed, size
+            params['cursor'] = cursor
@@ -0,0 +1,56 @@
+"""
+Benchmark full-length PDF report generation: time and peak Python memory
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from api.ingest import prepare_frame, ingest_frame
+from api.models import Dataset
+from api.utils import generate_pdf_report
+from ._synthetic import make_frame
+
+
+class Command(BaseCommand):
+    help = 'Measure time and peak memory of sample and full PDF reports'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000)
+        parser.add_argument('--skip-memory', action='store_true',
+                            help='skip the (slow) tracemalloc pass')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        self.stdout.write(f'Reporting on {rows} synthetic rows (changes are rolled back)')
+
+        with transaction.atomic():
+            user = User.objects.create(username='__benchmark_report__')
+            dataset = Dataset.objects.create(user=user, name='benchmark')
+            ingest_frame(dataset, prepare_frame(make_frame(rows)))
+
+            for label, full in (('sample', False), ('full', True)):
+                elapsed, size = self._build(dataset, full)
+                line = f'{label:>8}: {elapsed:8.2f} s  pdf {size / 2**20:8.1f} MiB'
+                if not options['skip_memory']:
+                    # tracemalloc slows the build down, so measure it separately
+                    tracemalloc.start()
+                    self._build(dataset, full)
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    line += f'  peak {peak / 2**20:8.1f} MiB'
+                self.stdout.write(line)
+            transaction.set_rollback(True)
+
+    def _build(self, dataset, full):
+        fd, path = tempfile.mkstemp(suffix='.pdf')
+        try:
+            with os.fdopen(fd, 'wb') as output:
+                start = time.perf_counter()
+                generate_pdf_report(dataset, full=full, output=output)
+                elapsed = time.perf_counter() - start
+            return elapsed, os.path.getsize(path)
+        finally:
+            os.unlink(path)
@@ -0,0 +1,24 @@
+"""
+Fail background jobs whose worker is gone and clean up after them
+"""
+from django.core.management.base import BaseCommand
+from api.jobs import fail_stale_ingest_jobs, fail_stale_report_jobs
+
+
+class Command(BaseCommand):
+    help = ('Fail ingest and report jobs that stopped making progress and delete the '
+            'unfinished datasets of the ingest jobs')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='fail every active job regardless of age; only safe before the '
+                 'server starts, when no worker can still be running one'
+        )
+
+    def handle(self, *args, **options):
+        timeout = 0 if options['all'] else None
+        failed = fail_stale_ingest_jobs(timeout)
+        self.stdout.write(f'Failed {failed} stale ingest job(s)')
+        failed = fail_stale_report_jobs(timeout)
+        self.stdout.write(f'Failed {failed} stale report job(s)')
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.9 on 2026-10-18 04:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0004_ingest_jobs"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dataset",
+            name="content_hash",
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="ingestjob",
+            name="deduplicated",
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.9 on 2026-10-18 04:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0005_dataset_content_hash"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DatasetStatistics",
+            fields=[
+                (
+                    "dataset",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="statistics",
+                        serialize=False,
+                        to="api.dataset",
+                    ),
+                ),
+                ("version", models.PositiveSmallIntegerField(default=0)),
+                ("parameters", models.JSONField(default=dict)),
+                ("type_distribution", models.JSONField(default=list)),
+                ("computed_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name_plural": "dataset statistics",
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.9 on 2026-10-18 04:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0007_type_statistics"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="equipmentdata",
+            index=models.Index(
+                fields=["dataset", "equipment_name", "id"], name="equipment_keyset_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.9 on 2026-10-18 04:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0009_report_jobs"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reportjob",
+            name="full",
+            field=models.BooleanField(default=False),
+        ),
+    ]
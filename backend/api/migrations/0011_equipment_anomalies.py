@@ -0,0 +1,34 @@
+# Generated by Django 4.2.9 on 2026-10-18 05:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0010_report_job_full"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="datasetstatistics",
+            name="anomaly_counts",
+            field=models.JSONField(default=dict),
+        ),
+        migrations.AddField(
+            model_name="equipmentdata",
+            name="anomaly_flags",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="equipmentdata",
+            name="anomaly_score",
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddIndex(
+            model_name="equipmentdata",
+            index=models.Index(
+                fields=["dataset", "-anomaly_score", "id"], name="equipment_anomaly_idx"
+            ),
+        ),
+    ]
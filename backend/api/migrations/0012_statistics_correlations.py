@@ -0,0 +1,18 @@
+# Generated by Django 4.2.9 on 2026-10-18 05:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0011_equipment_anomalies"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="datasetstatistics",
+            name="correlations",
+            field=models.JSONField(default=dict),
+        ),
+    ]
@@ -0,0 +1,101 @@
+# Generated by Django 4.2.9 on 2026-10-18 05:56
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_trend_points(apps, schema_editor):
+    # Record every ready dataset; extremes come from one GROUP BY over all rows
+    Dataset = apps.get_model("api", "Dataset")
+    EquipmentData = apps.get_model("api", "EquipmentData")
+    DatasetTrendPoint = apps.get_model("api", "DatasetTrendPoint")
+    fields = ["flowrate", "pressure", "temperature"]
+    aggregates = {}
+    for field in fields:
+        aggregates[f"{field}_min"] = models.Min(field)
+        aggregates[f"{field}_max"] = models.Max(field)
+    extremes = {
+        row.pop("dataset"): row
+        for row in EquipmentData.objects.values("dataset").annotate(**aggregates).order_by()
+    }
+    DatasetTrendPoint.objects.bulk_create([
+        DatasetTrendPoint(
+            user_id=dataset.user_id,
+            dataset=dataset,
+            dataset_name=dataset.name,
+            recorded_at=dataset.uploaded_at,
+            total_count=dataset.total_count,
+            flowrate_mean=dataset.avg_flowrate,
+            pressure_mean=dataset.avg_pressure,
+            temperature_mean=dataset.avg_temperature,
+            type_counts=dataset.equipment_types,
+            **{key: value or 0.0 for key, value in extremes.get(dataset.id, {}).items()},
+        )
+        for dataset in Dataset.objects.filter(is_ready=True)
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("api", "0012_statistics_correlations"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DatasetTrendPoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("dataset_name", models.CharField(max_length=255)),
+                ("recorded_at", models.DateTimeField()),
+                ("total_count", models.IntegerField(default=0)),
+                ("flowrate_mean", models.FloatField(default=0.0)),
+                ("flowrate_min", models.FloatField(default=0.0)),
+                ("flowrate_max", models.FloatField(default=0.0)),
+                ("pressure_mean", models.FloatField(default=0.0)),
+                ("pressure_min", models.FloatField(default=0.0)),
+                ("pressure_max", models.FloatField(default=0.0)),
+                ("temperature_mean", models.FloatField(default=0.0)),
+                ("temperature_min", models.FloatField(default=0.0)),
+                ("temperature_max", models.FloatField(default=0.0)),
+                ("type_counts", models.JSONField(default=dict)),
+                (
+                    "dataset",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="trend_point",
+                        to="api.dataset",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="trend_points",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["recorded_at", "id"],
+                "indexes": [
+                    models.Index(
+                        fields=["user", "recorded_at", "id"], name="trend_user_time_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_trend_points, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.conf import settings
 import json
+import uuid
 
 
 class Dataset(models.Model):
@@ -18,6 +19,12 @@ class Dataset(models.Model):
     avg_temperature = models.FloatField(default=0.0)
     equipment_types = models.JSONField(default=dict)  # Store type distribution
     
+    # SHA-256 of the uploaded bytes, used to skip re-ingesting identical files
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)
+    
+    # Set once the ingest job has committed; hidden from the API until then
+    is_ready = models.BooleanField(default=False, db_index=True)
+    
     class Meta:
         ordering = ['-uploaded_at']
         
@@ -27,7 +34,7 @@ class Dataset(models.Model):
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
         # Clean up old datasets if more than MAX_DATASETS
-        user_datasets = Dataset.objects.filter(user=self.user).order_by('-uploaded_at')
+        user_datasets = Dataset.objects.filter(user=self.user, is_ready=True).order_by('-uploaded_at')
         max_datasets = getattr(settings, 'MAX_DATASETS', 5)
         
         if user_datasets.count() > max_datasets:
@@ -49,8 +56,162 @@ class EquipmentData(models.Model):
     pressure = models.FloatField()
     temperature = models.FloatField()
     
+    # Bitmask of api.anomalies flags, set after ingest from the dataset's statistics
+    anomaly_flags = models.PositiveSmallIntegerField(default=0)
+    # Largest deviation in standard deviations for flagged rows, 0 otherwise
+    anomaly_score = models.FloatField(default=0.0)
+    
     class Meta:
         ordering = ['equipment_name']
+        indexes = [
+            # Serves keyset pagination on (equipment_name, id) within a dataset
+            models.Index(fields=['dataset', 'equipment_name', 'id'], name='equipment_keyset_idx'),
+            # Only flagged rows have a positive score, so listing anomalies
+            # is a range scan over them alone
+            models.Index(fields=['dataset', '-anomaly_score', 'id'], name='equipment_anomaly_idx'),
+        ]
         
     def __str__(self):
         return f"{self.equipment_name} ({self.equipment_type})"
+
+
+class DatasetStatistics(models.Model):
+    """Model to store per-dataset statistics computed once at ingest"""
+    dataset = models.OneToOneField(Dataset, on_delete=models.CASCADE, primary_key=True,
+                                   related_name='statistics')
+    # Bumped by api.statistics.STATS_VERSION when the stored shape changes
+    version = models.PositiveSmallIntegerField(default=0)
+    
+    # {parameter: {count, mean, min, max, std, q1, median, q3}}
+    parameters = models.JSONField(default=dict)
+    # [{type, count, percentage}]
+    type_distribution = models.JSONField(default=list)
+    # [{type, count, <parameter>: {mean, min, max, std}}]
+    type_statistics = models.JSONField(default=list)
+    # {flag name: flagged row count, 'total': rows with any flag}
+    anomaly_counts = models.JSONField(default=dict)
+    # api.correlations payload; filled on first request, cleared on rebuild
+    correlations = models.JSONField(default=dict)
+    computed_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = 'dataset statistics'
+        
+    def __str__(self):
+        return f"Statistics for {self.dataset_id}"
+
+
+class DatasetTrendPoint(models.Model):
+    """Model to keep a dataset's aggregates after retention deletes the dataset"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='trend_points')
+    dataset = models.OneToOneField(Dataset, on_delete=models.SET_NULL, null=True, blank=True,
+                                   related_name='trend_point')
+    dataset_name = models.CharField(max_length=255)
+    # Upload time of the dataset
+    recorded_at = models.DateTimeField()
+    
+    total_count = models.IntegerField(default=0)
+    flowrate_mean = models.FloatField(default=0.0)
+    flowrate_min = models.FloatField(default=0.0)
+    flowrate_max = models.FloatField(default=0.0)
+    pressure_mean = models.FloatField(default=0.0)
+    pressure_min = models.FloatField(default=0.0)
+    pressure_max = models.FloatField(default=0.0)
+    temperature_mean = models.FloatField(default=0.0)
+    temperature_min = models.FloatField(default=0.0)
+    temperature_max = models.FloatField(default=0.0)
+    # {type: count}
+    type_counts = models.JSONField(default=dict)
+    
+    class Meta:
+        ordering = ['recorded_at', 'id']
+        indexes = [
+            # Serves date range scans of one user's history
+            models.Index(fields=['user', 'recorded_at', 'id'], name='trend_user_time_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Trend point for {self.dataset_name} ({self.recorded_at:%Y-%m-%d})"
+
+
+class ResponseCacheVersion(models.Model):
+    """
+    Version of a user's cached API responses, bumped whenever any of their
+    datasets changes. Kept in the database so every server process sees an
+    upload or deletion handled by another one.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True,
+                                related_name='response_cache_version')
+    version = models.BigIntegerField(default=0)
+    
+    def __str__(self):
+        return f"Response cache version {self.version} for {self.user_id}"
+
+
+class BackgroundJob(models.Model):
+    """Abstract base for work done outside the request/response cycle"""
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    ACTIVE_STATUSES = [STATUS_PENDING, STATUS_RUNNING]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    error = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Heartbeat: refreshed on every status or progress change, so an active
+    # job that has not been updated for long lost its worker (see api.jobs)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        abstract = True
+        ordering = ['-created_at']
+
+
+class IngestJob(BackgroundJob):
+    """Model to track background CSV ingest jobs"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='ingest_jobs')
+    dataset = models.ForeignKey(Dataset, on_delete=models.SET_NULL, null=True, blank=True,
+                                related_name='ingest_jobs')
+    
+    # Progress counters, updated after every ingested chunk
+    rows_processed = models.IntegerField(default=0)
+    bytes_processed = models.BigIntegerField(default=0)
+    total_bytes = models.BigIntegerField(default=0)
+    # True when the upload matched an already ingested file
+    deduplicated = models.BooleanField(default=False)
+    
+    def __str__(self):
+        return f"Ingest {self.id} ({self.status})"
+    
+    @property
+    def progress(self):
+        if self.status == self.STATUS_COMPLETED:
+            return 1.0
+        if not self.total_bytes:
+            return 0.0
+        return min(self.bytes_processed / self.total_bytes, 1.0)
+
+
+class ReportJob(BackgroundJob):
+    """Model to track PDF reports built by the report process pool"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='report_jobs')
+    dataset = models.ForeignKey(Dataset, on_delete=models.SET_NULL, null=True, blank=True,
+                                related_name='report_jobs')
+    # Full reports list every equipment row instead of a sample
+    full = models.BooleanField(default=False)
+    # Cached PDF written by the worker (see api.reports)
+    file_path = models.CharField(max_length=500, blank=True)
+    
+    def __str__(self):
+        return f"Report {self.id} ({self.status})"
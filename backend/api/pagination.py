@@ -0,0 +1,141 @@
+"""
+Pagination classes for API endpoints
+"""
+import base64
+import json
+import math
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over a (field, unique tiebreaker) ordering.
+
+    The opaque cursor carries the last row's ordering values, so fetching
+    any page is an index range scan instead of an OFFSET walk. The leading
+    field may be descending ('-field'); the tiebreaker is always ascending.
+    Querysets may yield model instances or named values_list rows.
+    """
+    ordering = ('id',)
+    page_size = 100
+    max_page_size = 1000
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+    # Python type of each ordering value, checked before a cursor reaches
+    # the ORM (str, int or float; an int is accepted for float)
+    cursor_types = ()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.next_position = (
+            [getattr(rows[-1], field.lstrip('-')) for field in self.ordering]
+            if self.has_next else None
+        )
+        return rows
+
+    def after(self, position):
+        """
+        Rows strictly after position in ordering.
+
+        The leading >= (<= when descending) keeps the condition usable as
+        an index range.
+        """
+        (field, value), (tiebreaker, tie_value) = zip(self.ordering, position)
+        ge, gt = 'gte', 'gt'
+        if field.startswith('-'):
+            field, ge, gt = field[1:], 'lte', 'lt'
+        return Q(**{f'{field}__{ge}': value}) & (
+            Q(**{f'{field}__{gt}': value}) | Q(**{f'{tiebreaker}__gt': tie_value})
+        )
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        if not all(map(self.valid_value, position, self.cursor_types)):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    @staticmethod
+    def valid_value(value, kind):
+        if isinstance(value, bool):
+            return False
+        if kind is float:
+            return isinstance(value, (int, float)) and math.isfinite(value)
+        if kind is int:
+            # SQLite integers are 64-bit; larger ones overflow in the driver
+            return isinstance(value, int) and -2 ** 63 <= value < 2 ** 63
+        return isinstance(value, kind)
+
+    def encode_cursor(self, position):
+        return base64.urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('ascii')
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'next_cursor': self.encode_cursor(self.next_position) if self.has_next else None,
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'next_cursor': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+
+class EquipmentKeysetPagination(KeysetPagination):
+    """Keyset pagination for a dataset's equipment rows"""
+    ordering = ('equipment_name', 'id')
+    cursor_types = (str, int)
+
+
+class AnomalyKeysetPagination(KeysetPagination):
+    """Keyset pagination for flagged equipment rows, strongest first"""
+    ordering = ('-anomaly_score', 'id')
+    cursor_types = (float, int)
+
+
+class DiffPagination(PageNumberPagination):
+    """Page number pagination over a cached dataset diff"""
+    page_size = 100
+    max_page_size = 1000
+    page_size_query_param = 'page_size'
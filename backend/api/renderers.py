@@ -0,0 +1,86 @@
+"""
+Fast JSON renderers and renderers for non-JSON API formats
+"""
+import json
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional; JSONRenderer's encoder is used instead
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed.
+
+    Output matches JSONRenderer's: compact, UTF-8, U+2028/U+2029 escaped,
+    and dates, decimals and the like go through DRF's encoder. Only float
+    exponents are spelled differently (1e300 rather than 1e+300). Indented
+    output (an Accept header with indent=) is left to JSONRenderer.
+
+    NaN and infinity come out as null where JSONRenderer raises. Rather
+    than scanning every payload for them, they are kept out at the source:
+    ingest rejects non-finite parameters, and model float fields serialize
+    through FiniteFloatField, which raises for them.
+    """
+    options = (
+        (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_SERIALIZE_NUMPY)
+        if orjson else 0
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        ret = orjson.dumps(data, default=JSONEncoder().default, option=self.options)
+        # Same escapes as JSONRenderer, so the output is valid JavaScript
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class ColumnarJSONRenderer(FastJSONRenderer):
+    """
+    ?format=columnar: actions that support it return one array per field
+    instead of one object per row (see DatasetViewSet.equipment)
+    """
+    format = 'columnar'
+
+
+class StreamRenderer(BaseRenderer):
+    """
+    Renderer for actions that build their own (streaming) response body.
+
+    It exists so the format takes part in content negotiation (?format= or
+    Accept). Successful responses never reach render(); error payloads are
+    rendered as JSON.
+    """
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if isinstance(data, bytes):
+            return data
+        return json.dumps(data).encode('utf-8')
+
+
+class CSVRenderer(StreamRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class NDJSONRenderer(StreamRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+class ArrowRenderer(StreamRenderer):
+    media_type = 'application/vnd.apache.arrow.stream'
+    format = 'arrow'
+
+
+class ParquetRenderer(StreamRenderer):
+    media_type = 'application/vnd.apache.parquet'
+    format = 'parquet'
@@ -0,0 +1,151 @@
+"""
+On-disk cache of generated PDF reports
+"""
+import hashlib
+import os
+import tempfile
+import zipfile
+from pathlib import Path
+from django.conf import settings
+from .charts import CHART_NAMES, get_or_render_charts
+from .utils import generate_pdf_report
+
+
+# Bytes copied from a cached PDF into a bulk ZIP per write
+ZIP_CHUNK_SIZE = 64 * 1024
+
+# Increment when the report layout or its charts change so cached PDFs and
+# chart images are regenerated
+REPORT_VERSION = 2
+
+
+def report_cache_dir():
+    return Path(settings.REPORT_CACHE_DIR)
+
+
+def report_stamp(dataset):
+    """
+    Version stamp of a dataset's report content.
+
+    Datasets never change after ingest, so the upload identity plus the
+    layout version fully determines the PDF.
+    """
+    identity = ':'.join([
+        str(dataset.id),
+        dataset.uploaded_at.isoformat(),
+        dataset.content_hash,
+        str(dataset.total_count),
+        str(REPORT_VERSION),
+    ])
+    return hashlib.sha256(identity.encode('utf-8')).hexdigest()[:16]
+
+
+def report_path(dataset, full=False):
+    suffix = '_full' if full else ''
+    return report_cache_dir() / f'report_{dataset.id}_{report_stamp(dataset)}{suffix}.pdf'
+
+
+def chart_paths(dataset):
+    stamp = report_stamp(dataset)
+    return {
+        name: report_cache_dir() / f'chart_{dataset.id}_{stamp}_{name}.png'
+        for name in CHART_NAMES
+    }
+
+
+def get_or_build_report(dataset, full=False):
+    """
+    Return the path of the dataset's cached PDF, generating it on a miss
+    """
+    path = report_path(dataset, full)
+    if path.exists():
+        return path
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    charts = get_or_render_charts(dataset, chart_paths(dataset))
+    # Write to a temp file and rename so readers never see a partial PDF
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            generate_pdf_report(dataset, full=full, output=tmp, charts=charts)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return path
+
+
+def evict_reports(dataset_id):
+    """
+    Remove every cached report and chart image of a dataset
+    """
+    cache_dir = report_cache_dir()
+    for pattern in (f'report_{dataset_id}_*.pdf', f'chart_{dataset_id}_*.png'):
+        for path in cache_dir.glob(pattern):
+            path.unlink(missing_ok=True)
+
+
+class ZipStreamBuffer:
+    """
+    Write-only, non-seekable sink for zipfile that is drained as it fills.
+
+    zipfile falls back to data descriptors when it cannot seek, so entries
+    are written strictly front to back and can be sent immediately. The
+    Arrow and Parquet exports stream through it the same way.
+    """
+    closed = False
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def report_filename(dataset_id, full=False):
+    suffix = '_full' if full else ''
+    return f'equipment_report_{dataset_id}{suffix}.pdf'
+
+
+def stream_report_zip(built_reports, full=False):
+    """
+    Yield a ZIP archive of (dataset, path, error) results as they arrive.
+
+    Each PDF is copied in chunks from the report cache, so at most one
+    chunk is held in memory. Failed datasets are listed in errors.txt.
+    """
+    buffer = ZipStreamBuffer()
+    errors = []
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+        for dataset, path, error in built_reports:
+            if error is not None:
+                errors.append(f'{dataset.id} ({dataset.name}): {error}')
+                continue
+            with open(path, 'rb') as source, \
+                    archive.open(report_filename(dataset.id, full), 'w') as entry:
+                while chunk := source.read(ZIP_CHUNK_SIZE):
+                    entry.write(chunk)
+                    data = buffer.drain()
+                    if data:
+                        yield data
+        if errors:
+            archive.writestr('errors.txt', '\n'.join(errors) + '\n')
+    # Remaining entry trailers and the central directory
+    yield buffer.drain()
@@ -1,6 +1,90 @@
+import math
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth.models import User
-from .models import Dataset, EquipmentData
+from django.db import models
+from django.template.defaultfilters import filesizeformat
+from .models import Dataset, EquipmentData, IngestJob, ReportJob
+from .anomalies import FLAGS, flag_names
+from .chart_data import DEFAULT_BINS, DEFAULT_POINTS, DEFAULT_TOP
+from .diff import DIFF_STATUSES
+from .trends import DEFAULT_WINDOW
+
+
+def field_list(value):
+    return [name for name in (value or '').split(',') if name]
+
+
+class FiniteFloatField(serializers.FloatField):
+    """
+    FloatField that refuses NaN and infinity on output, as JSONRenderer
+    does under STRICT_JSON; FastJSONRenderer would write them as null
+    """
+    
+    def to_representation(self, value):
+        value = float(value)
+        if not math.isfinite(value):
+            raise ValueError(f"Out of range float value for {self.field_name}: {value}")
+        return value
+
+
+class FiniteFloatMixin:
+    """ModelSerializer mixin that maps model FloatFields to FiniteFloatField"""
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        models.FloatField: FiniteFloatField,
+    }
+
+
+class DynamicFieldsMixin:
+    """
+    Sparse fieldsets for a ModelSerializer: ?fields=a,b keeps only those
+    fields and ?exclude=c drops fields, for the request in the context.
+
+    project() applies the same selection to the queryset, so columns no
+    selected field reads are never loaded. Unknown names are rejected there
+    (and by selected_fields), in the view; the constructor ignores them, as
+    it also runs while an error response is rendered (browsable API forms).
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is not None:
+            selected = self.selected_fields(request.query_params, strict=False)
+            for name in [name for name in self.fields if name not in selected]:
+                self.fields.pop(name)
+    
+    @classmethod
+    def selected_fields(cls, params, strict=True):
+        names = list(cls.Meta.fields)
+        fields, exclude = field_list(params.get('fields')), field_list(params.get('exclude'))
+        unknown = sorted(set(fields + exclude) - set(names))
+        if unknown and strict:
+            raise serializers.ValidationError({'fields': [f"Unknown field(s): {', '.join(unknown)}"]})
+        return [name for name in names if (not fields or name in fields) and name not in exclude]
+    
+    @classmethod
+    def project(cls, queryset, request, always=()):
+        """
+        Defer every model column the selected fields do not read; always
+        names columns the view itself needs
+        """
+        columns = set(always)
+        related = []
+        fields = cls().fields
+        for name in cls.selected_fields(request.query_params):
+            field = fields[name]
+            if isinstance(field, serializers.BaseSerializer):
+                related.append(field.source)
+                columns.update(f'{field.source}__{child.source}' for child in field.fields.values())
+            else:
+                columns.add(field.source)
+        queryset = queryset.select_related(None)
+        if related:
+            # With no arguments select_related() would follow every relation
+            queryset = queryset.select_related(*related)
+        return queryset.only(*columns)
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -31,7 +115,7 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return user
 
 
-class EquipmentDataSerializer(serializers.ModelSerializer):
+class EquipmentDataSerializer(DynamicFieldsMixin, FiniteFloatMixin, serializers.ModelSerializer):
     """Serializer for EquipmentData model"""
     class Meta:
         model = EquipmentData
@@ -39,30 +123,39 @@ class EquipmentDataSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
-class DatasetSerializer(serializers.ModelSerializer):
-    """Serializer for Dataset model"""
+class AnomalySerializer(EquipmentDataSerializer):
+    """Serializer for a flagged equipment row"""
+    anomalies = serializers.SerializerMethodField()
+    
+    class Meta(EquipmentDataSerializer.Meta):
+        fields = EquipmentDataSerializer.Meta.fields + ['anomaly_score', 'anomalies']
+    
+    def get_anomalies(self, obj):
+        return flag_names(obj.anomaly_flags)
+
+
+class DatasetSerializer(DynamicFieldsMixin, FiniteFloatMixin, serializers.ModelSerializer):
+    """Serializer for Dataset model; rows are paged via the equipment action"""
     user = UserSerializer(read_only=True)
-    equipment = EquipmentDataSerializer(many=True, read_only=True)
-    equipment_count = serializers.SerializerMethodField()
+    # Stored at ingest, so no per-row COUNT query
+    equipment_count = serializers.IntegerField(source='total_count', read_only=True)
     
     class Meta:
         model = Dataset
         fields = [
             'id', 'user', 'name', 'file', 'uploaded_at',
             'total_count', 'avg_flowrate', 'avg_pressure', 'avg_temperature',
-            'equipment_types', 'equipment', 'equipment_count'
+            'equipment_types', 'equipment_count'
         ]
         read_only_fields = ['id', 'uploaded_at', 'total_count', 'avg_flowrate', 
                            'avg_pressure', 'avg_temperature', 'equipment_types']
-    
-    def get_equipment_count(self, obj):
-        return obj.equipment.count()
 
 
-class DatasetListSerializer(serializers.ModelSerializer):
+class DatasetListSerializer(DynamicFieldsMixin, FiniteFloatMixin, serializers.ModelSerializer):
     """Lightweight serializer for listing datasets"""
     user = UserSerializer(read_only=True)
-    equipment_count = serializers.SerializerMethodField()
+    # Stored at ingest, so no per-row COUNT query
+    equipment_count = serializers.IntegerField(source='total_count', read_only=True)
     
     class Meta:
         model = Dataset
@@ -72,9 +165,6 @@ class DatasetListSerializer(serializers.ModelSerializer):
             'equipment_types', 'equipment_count'
         ]
         read_only_fields = ['id', 'uploaded_at']
-    
-    def get_equipment_count(self, obj):
-        return obj.equipment.count()
 
 
 class DatasetUploadSerializer(serializers.Serializer):
@@ -86,8 +176,95 @@ class DatasetUploadSerializer(serializers.Serializer):
         if not value.name.endswith('.csv'):
             raise serializers.ValidationError("Only CSV files are allowed")
         
-        # Check file size (5MB max)
-        if value.size > 5 * 1024 * 1024:
-            raise serializers.ValidationError("File size must be less than 5MB")
+        # Check file size against the deployment limit
+        max_size = getattr(settings, 'UPLOAD_MAX_FILE_SIZE', 0)
+        if max_size and value.size > max_size:
+            raise serializers.ValidationError(
+                f"File size must be less than {filesizeformat(max_size)}"
+            )
         
         return value
+
+
+class BulkReportSerializer(serializers.Serializer):
+    """Serializer for bulk report export requests"""
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=100
+    )
+    full = serializers.BooleanField(default=False)
+
+
+class ComparisonQuerySerializer(serializers.Serializer):
+    """Serializer for dataset comparison requests"""
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        max_length=10
+    )
+    
+    def validate_ids(self, value):
+        # Repeated ids compare a dataset with itself; count distinct ones
+        value = list(dict.fromkeys(value))
+        if len(value) < 2:
+            raise serializers.ValidationError("Ensure this field has at least 2 distinct ids.")
+        return value
+
+
+class DiffQuerySerializer(serializers.Serializer):
+    """Serializer for dataset diff parameters"""
+    other = serializers.IntegerField(min_value=1)
+    threshold = serializers.FloatField(min_value=0, default=0.0)
+    status = serializers.ChoiceField(choices=DIFF_STATUSES, required=False)
+
+
+class TrendQuerySerializer(serializers.Serializer):
+    """Serializer for trend range parameters; both dates are inclusive"""
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    window = serializers.IntegerField(min_value=1, max_value=50, default=DEFAULT_WINDOW)
+    
+    def validate(self, data):
+        if 'start' in data and 'end' in data and data['start'] > data['end']:
+            raise serializers.ValidationError("start must not be after end")
+        return data
+
+
+class ChartDataQuerySerializer(serializers.Serializer):
+    """Serializer for chart data query parameters"""
+    bins = serializers.IntegerField(min_value=1, max_value=200, default=DEFAULT_BINS)
+    points = serializers.IntegerField(min_value=3, max_value=5000, default=DEFAULT_POINTS)
+    top = serializers.IntegerField(min_value=1, max_value=100, default=DEFAULT_TOP)
+
+
+class AnomalyQuerySerializer(serializers.Serializer):
+    """Serializer for anomaly list filters"""
+    flag = serializers.ChoiceField(choices=list(FLAGS), required=False)
+    type = serializers.CharField(required=False)
+    min_score = serializers.FloatField(min_value=0, required=False)
+
+
+class IngestJobSerializer(serializers.ModelSerializer):
+    """Serializer for background ingest job status"""
+    progress = serializers.FloatField(read_only=True)
+    
+    class Meta:
+        model = IngestJob
+        fields = [
+            'id', 'dataset', 'status', 'progress', 'rows_processed',
+            'bytes_processed', 'total_bytes', 'error', 'deduplicated',
+            'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
+
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    """Serializer for background report job status"""
+    
+    class Meta:
+        model = ReportJob
+        fields = [
+            'id', 'dataset', 'full', 'status', 'error',
+            'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
@@ -0,0 +1,21 @@
+"""
+Signal handlers for API models
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .cache import response_cache
+from .models import Dataset
+from .reports import evict_reports
+
+
+@receiver(post_delete, sender=Dataset)
+def evict_dataset_reports(sender, instance, **kwargs):
+    """Drop cached reports of deleted or retention-pruned datasets"""
+    evict_reports(instance.id)
+
+
+@receiver(post_save, sender=Dataset)
+@receiver(post_delete, sender=Dataset)
+def bump_dataset_cache_version(sender, instance, **kwargs):
+    """Invalidate the owner's cached responses on upload, delete or pruning"""
+    response_cache.bump_user_version(instance.user_id)
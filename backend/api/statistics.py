@@ -0,0 +1,222 @@
+"""
+Precomputed dataset statistics
+"""
+import math
+from django.db import transaction
+from django.db.models import Avg, Case, Count, F, IntegerField, Max, Min, Q, StdDev, Value, When, Window
+from django.db.models.functions import RowNumber
+from .anomalies import detect_anomalies
+from .models import DatasetStatistics
+
+# Increment when build_statistics starts storing something new; rows with an
+# older version are rebuilt on next read
+STATS_VERSION = 3
+
+NUMERIC_FIELDS = ['flowrate', 'pressure', 'temperature']
+QUARTILES = [('q1', 0.25), ('median', 0.5), ('q3', 0.75)]
+
+
+def sample_std(population_std, count):
+    """
+    Sample standard deviation from a population one, 0 below two values
+    (as the ingest accumulator reports it).
+
+    SQLite's sample STDDEV raises for a single value, so queries aggregate
+    the population deviation, which is defined for any non-empty group.
+    """
+    if count < 2 or not population_std:
+        return 0
+    return population_std * math.sqrt(count / (count - 1))
+
+
+def aggregate_parameters(dataset):
+    """
+    Count/mean/min/max/std of every parameter in one aggregate query
+    """
+    aggregates = {}
+    for field in NUMERIC_FIELDS:
+        aggregates[f'{field}__count'] = Count(field)
+        aggregates[f'{field}__mean'] = Avg(field)
+        aggregates[f'{field}__min'] = Min(field)
+        aggregates[f'{field}__max'] = Max(field)
+        aggregates[f'{field}__std'] = StdDev(field)
+    row = dataset.equipment.aggregate(**aggregates)
+    parameters = {}
+    for field in NUMERIC_FIELDS:
+        stats = {key: row[f'{field}__{key}'] or 0 for key in ('count', 'mean', 'min', 'max')}
+        stats['std'] = sample_std(row[f'{field}__std'], stats['count'])
+        parameters[field] = stats
+    return parameters
+
+
+def quartiles(dataset, count):
+    """
+    Exact q1/median/q3 of every parameter with linear interpolation
+    (pandas' default), in one query.
+
+    A ROW_NUMBER() window per parameter numbers the rows in that
+    parameter's order, so the table is sorted once per parameter and only
+    the rows either side of each quartile position are returned.
+    """
+    if not count:
+        return {field: {key: 0.0 for key, _ in QUARTILES} for field in NUMERIC_FIELDS}
+    positions = {key: q * (count - 1) for key, q in QUARTILES}
+    # Row numbers are 1-based; position p interpolates rows floor(p)+1 and floor(p)+2
+    wanted = sorted({
+        row for position in positions.values()
+        for row in (math.floor(position) + 1, math.floor(position) + 2) if row <= count
+    })
+    numbers = {
+        f'{field}_row': Window(RowNumber(), order_by=F(field).asc())
+        for field in NUMERIC_FIELDS
+    }
+    condition = Q()
+    for name in numbers:
+        condition |= Q(**{f'{name}__in': wanted})
+    rows = (
+        dataset.equipment.annotate(**numbers).filter(condition)
+        .order_by().values_list(*NUMERIC_FIELDS, *numbers)
+    )
+
+    values = {field: {} for field in NUMERIC_FIELDS}
+    for row in rows:
+        for field, value, number in zip(NUMERIC_FIELDS, row, row[len(NUMERIC_FIELDS):]):
+            values[field][number] = value
+
+    result = {}
+    for field in NUMERIC_FIELDS:
+        result[field] = {}
+        for key, position in positions.items():
+            low = math.floor(position)
+            below = values[field][low + 1]
+            above = values[field].get(low + 2, below)
+            result[field][key] = float(below + (above - below) * (position - low))
+    return result
+
+
+def type_distribution(dataset):
+    """
+    Equipment type counts with their share of the dataset
+    """
+    total = dataset.total_count
+    return [
+        {
+            'type': eq_type,
+            'count': count,
+            'percentage': round((count / total) * 100, 2) if total else 0,
+        }
+        for eq_type, count in dataset.equipment_types.items()
+    ]
+
+
+def aggregate_by_type(dataset):
+    """
+    Per-type count and mean/min/max/std of every parameter in one GROUP BY
+    """
+    aggregates = {'count': Count('id')}
+    for field in NUMERIC_FIELDS:
+        aggregates[f'{field}__mean'] = Avg(field)
+        aggregates[f'{field}__min'] = Min(field)
+        aggregates[f'{field}__max'] = Max(field)
+        aggregates[f'{field}__std'] = StdDev(field)
+    rows = (
+        dataset.equipment.values('equipment_type')
+        .annotate(**aggregates)
+        .order_by('equipment_type')
+    )
+    return [
+        {
+            'type': row['equipment_type'],
+            'count': row['count'],
+            **{
+                field: {
+                    **{key: row[f'{field}__{key}'] or 0 for key in ('mean', 'min', 'max')},
+                    'std': sample_std(row[f'{field}__std'], row['count']),
+                }
+                for field in NUMERIC_FIELDS
+            },
+        }
+        for row in rows
+    ]
+
+
+def bin_edges(low, high, bins):
+    """
+    Equal-width bin edges over [low, high], computed like numpy.histogram
+    """
+    if high <= low:
+        # A single repeated value; numpy widens the range around it
+        low, high = low - 0.5, high + 0.5
+    step = (high - low) / bins
+    return [low + i * step for i in range(bins)] + [high]
+
+
+def histogram(dataset, field, low, high, bins):
+    """
+    Counts of a parameter in equal-width bins over [low, high] with
+    numpy.histogram semantics (last bin closed), bucketed by a single
+    GROUP BY so no column is loaded into memory
+    """
+    counts = [0] * bins
+    # Compare against the edges themselves, not (value - low) / width, so
+    # values sitting exactly on an edge land where numpy puts them
+    edges = bin_edges(low, high, bins)
+    bucket = Case(
+        *[When(**{f'{field}__lt': edges[i + 1]}, then=Value(i)) for i in range(bins - 1)],
+        default=Value(bins - 1),
+        output_field=IntegerField()
+    )
+    rows = (
+        dataset.equipment.annotate(bucket=bucket)
+        .values('bucket')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    for row in rows:
+        counts[row['bucket']] = row['count']
+    return counts
+
+
+def build_statistics(dataset, parameters=None):
+    """
+    Compute and store the statistics row for a dataset.
+
+    parameters may carry count/mean/min/max/std already accumulated during
+    ingest; otherwise they are aggregated from EquipmentData. Outlier flags
+    on the rows are refreshed from the new statistics.
+    """
+    if parameters is None:
+        parameters = aggregate_parameters(dataset)
+
+    field_quartiles = quartiles(dataset, parameters[NUMERIC_FIELDS[0]]['count'])
+    for field in NUMERIC_FIELDS:
+        parameters[field] = {**parameters[field], **field_quartiles[field]}
+
+    with transaction.atomic():
+        statistics, _ = DatasetStatistics.objects.update_or_create(
+            dataset=dataset,
+            defaults={
+                'version': STATS_VERSION,
+                'parameters': parameters,
+                'type_distribution': type_distribution(dataset),
+                'type_statistics': aggregate_by_type(dataset),
+                'correlations': {},
+            }
+        )
+        statistics.anomaly_counts = detect_anomalies(dataset, statistics)
+        statistics.save(update_fields=['anomaly_counts'])
+    return statistics
+
+
+def get_statistics(dataset):
+    """
+    Return a dataset's statistics, building them if missing or outdated
+    """
+    try:
+        statistics = dataset.statistics
+    except DatasetStatistics.DoesNotExist:
+        statistics = None
+    if statistics is None or statistics.version != STATS_VERSION:
+        statistics = build_statistics(dataset)
+        dataset.statistics = statistics
+    return statistics
@@ -0,0 +1,55 @@
+"""
+Shared fixtures for the API tests
+"""
+import io
+import shutil
+import tempfile
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import override_settings
+from api.ingest import ingest_csv, ingest_frame, prepare_frame
+from api.management.commands._synthetic import make_frame
+from api.models import Dataset
+
+HEADER = b'Equipment Name,Type,Flowrate,Pressure,Temperature\n'
+ROWS = b'A,Pump,1,2,3\nB,Valve,4,5,6\n'
+CSV = HEADER + ROWS
+PASSWORD = 'password123'
+
+
+def make_user(username='tester'):
+    return User.objects.create_user(username, password=PASSWORD)
+
+
+def make_dataset(user, rows=ROWS, name='dataset', **fields):
+    """A ready dataset ingested from CSV rows (bytes or str, without the header)"""
+    if isinstance(rows, str):
+        rows = rows.encode('utf-8')
+    dataset = Dataset.objects.create(user=user, name=name, **fields)
+    return ingest_csv(dataset, io.BytesIO(HEADER + rows))
+
+
+def make_synthetic_dataset(user, rows=200, seed=0, name='synthetic'):
+    """A ready dataset of generated rows, see _synthetic.make_frame"""
+    dataset = Dataset.objects.create(user=user, name=name)
+    return ingest_frame(dataset, prepare_frame(make_frame(rows, seed=seed)))
+
+
+def use_settings(test, **options):
+    """Override settings until the end of the test (call from setUp)"""
+    override = override_settings(**options)
+    override.enable()
+    test.addCleanup(override.disable)
+
+
+def temp_dir(test):
+    """A temporary directory removed after the test"""
+    path = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, path, ignore_errors=True)
+    return path
+
+
+def clear_caches():
+    """Empty every cache alias, so requests are measured cold"""
+    for alias in caches:
+        caches[alias].clear()
@@ -0,0 +1,34 @@
+from unittest import mock
+from django.test import TestCase, override_settings
+from api.anomalies import detect_anomalies
+from api.models import EquipmentData
+from .factories import make_synthetic_dataset, make_user
+
+
+class AnomalyBatchTests(TestCase):
+    """Flagged rows are written back in bounded batches while scoring"""
+
+    def setUp(self):
+        self.dataset = make_synthetic_dataset(make_user(), rows=2000, seed=3)
+        self.statistics = self.dataset.statistics
+
+    def flags(self):
+        return list(self.dataset.equipment.order_by('id').values_list('anomaly_flags', 'anomaly_score'))
+
+    @override_settings(INGEST_BATCH_SIZE=5)
+    def test_batches_match_a_single_pass(self):
+        expected, counts = self.flags(), self.statistics.anomaly_counts
+        self.assertGreater(counts['total'], 10)
+
+        batches = []
+        bulk_update = EquipmentData.objects.bulk_update
+
+        def record(objs, *args, **kwargs):
+            batches.append(len(objs))
+            return bulk_update(objs, *args, **kwargs)
+
+        with mock.patch.object(EquipmentData.objects, 'bulk_update', side_effect=record):
+            self.assertEqual(detect_anomalies(self.dataset, self.statistics, chunk_size=300), counts)
+        self.assertEqual(self.flags(), expected)
+        self.assertLessEqual(max(batches), 5)
+        self.assertEqual(sum(batches), counts['total'])
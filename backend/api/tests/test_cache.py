@@ -0,0 +1,79 @@
+from unittest import mock
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils.http import http_date
+from api.cache import ResponseCache
+from api.models import ResponseCacheVersion
+from .factories import clear_caches, make_dataset, make_user
+
+
+class ResponseCacheTests(TestCase):
+
+    def setUp(self):
+        clear_caches()
+        self.user = make_user()
+        make_dataset(self.user)
+        self.client.force_login(self.user)
+
+    def get(self, **extra):
+        return self.client.get('/api/datasets/?page_size=1', **extra)['X-Cache']
+
+    def test_entries_are_keyed_by_scheme_and_host(self):
+        self.assertEqual(self.get(HTTP_HOST='a.example'), 'MISS')
+        self.assertEqual(self.get(HTTP_HOST='a.example'), 'HIT')
+        # Cached bodies hold absolute pagination links
+        self.assertEqual(self.get(HTTP_HOST='b.example'), 'MISS')
+        self.assertEqual(self.get(HTTP_HOST='a.example', secure=True), 'MISS')
+
+    def test_version_is_shared_through_the_database(self):
+        self.assertEqual(self.get(), 'MISS')
+        self.assertEqual(self.get(), 'HIT')
+        # As when another server process handled an upload or deletion
+        ResponseCacheVersion.objects.filter(user=self.user).update(version=1)
+        self.assertEqual(self.get(), 'MISS')
+
+    def test_deleting_a_dataset_invalidates(self):
+        self.assertEqual(self.get(), 'MISS')
+        self.user.datasets.get().delete()
+        self.assertEqual(self.get(), 'MISS')
+
+    @override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'bounded': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'bounded',
+            'OPTIONS': {'MAX_ENTRIES': 10},
+        },
+    })
+    def test_backend_bounds_the_entries(self):
+        response_cache = ResponseCache(alias='bounded')
+        request = RequestFactory().get('/api/datasets/')
+        request.user = self.user
+        keys = [response_cache.key(request, 'list', n) for n in range(50)]
+        for key in keys:
+            response_cache.set(key, {'n': key})
+        self.assertLessEqual(sum(response_cache.backend.get(key) is not None for key in keys), 10)
+        self.assertEqual(response_cache.stats()['max_entries'], 10)
+
+
+class ConditionalResponseTests(TestCase):
+    """Dataset responses are validated by ETag only"""
+
+    def setUp(self):
+        clear_caches()
+        self.user = make_user()
+        dataset = make_dataset(self.user)
+        self.url = f'/api/datasets/{dataset.id}/summary/'
+        self.client.force_login(self.user)
+
+    def test_etag_round_trip(self):
+        response = self.client.get(self.url)
+        self.assertNotIn('Last-Modified', response)
+        etag = response['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # A statistics upgrade changes the representation of an old dataset
+        with mock.patch('api.cache.STATS_VERSION', -1):
+            self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_if_modified_since_is_ignored(self):
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=http_date())
+        self.assertEqual(response.status_code, 200)
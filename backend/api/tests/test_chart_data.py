@@ -0,0 +1,35 @@
+from django.test import TestCase
+from .factories import make_synthetic_dataset, make_user
+
+
+class ChartDataTests(TestCase):
+    """Chart payloads are sized by ?bins=, ?points= and ?top=, not by rows"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user()
+        cls.dataset = make_synthetic_dataset(cls.user, rows=1000)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.url = f'/api/datasets/{self.dataset.id}/chart_data/'
+
+    def test_downsampled(self):
+        data = self.client.get(self.url, {'bins': 8, 'points': 50, 'top': 3}).json()
+        self.assertEqual(data['total_count'], 1000)
+        for field, values in data['parameters'].items():
+            with self.subTest(field=field):
+                self.assertEqual(len(values['histogram']['counts']), 8)
+                self.assertEqual(sum(values['histogram']['counts']), 1000)
+                self.assertEqual(len(values['series']['y']), 50)
+                # The series keeps both ends of the data
+                self.assertEqual(values['series']['x'][0], 0)
+                self.assertEqual(values['series']['x'][-1], 999)
+                top = [row[field] for row in values['top']]
+                self.assertEqual(len(top), 3)
+                self.assertEqual(top, sorted(top, reverse=True))
+                self.assertEqual(top[0], max(self.dataset.equipment.values_list(field, flat=True)))
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(self.url, {'bins': 0}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'points': 2}).status_code, 400)
@@ -0,0 +1,24 @@
+from django.test import TestCase
+from .factories import make_dataset, make_user
+
+
+class CompareIdsTests(TestCase):
+    """Comparisons need at least two distinct datasets"""
+
+    def setUp(self):
+        self.user = make_user()
+        self.datasets = [make_dataset(self.user, name=name) for name in ('first', 'second')]
+        self.client.force_login(self.user)
+
+    def test_repeated_id_is_rejected(self):
+        first = self.datasets[0].id
+        for query in (f'{first},{first}', f'{first}&ids={first}'):
+            response = self.client.get(f'/api/datasets/compare/?ids={query}')
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn('ids', response.json())
+
+    def test_duplicates_are_dropped(self):
+        first, second = (dataset.id for dataset in self.datasets)
+        response = self.client.get(f'/api/datasets/compare/?ids={first},{second},{first}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['datasets']), 2)
@@ -0,0 +1,29 @@
+from django.test import TestCase
+from .factories import make_dataset, make_user
+
+
+class CorrelationTests(TestCase):
+    """Correlations and fits are computed overall and per equipment type"""
+
+    def setUp(self):
+        self.user = make_user()
+        # pressure = 2 * flowrate + 1, temperature falls as flowrate rises
+        self.dataset = make_dataset(self.user, 'A,Pump,1,3,9\nB,Pump,2,5,4\nC,Pump,3,7,1\nD,Valve,4,9,0\n')
+        self.client.force_login(self.user)
+
+    def test_correlations(self):
+        data = self.client.get(f'/api/datasets/{self.dataset.id}/correlations/').json()
+        self.assertEqual(data['fields'], ['flowrate', 'pressure', 'temperature'])
+        overall = data['overall']
+        self.assertEqual(overall['count'], 4)
+        self.assertEqual(overall['pearson'][0][1], 1.0)
+        self.assertLess(overall['pearson'][0][2], -0.9)
+        self.assertEqual(overall['spearman'][0][2], -1.0)
+        fit = next(fit for fit in overall['fits'] if (fit['x'], fit['y']) == ('flowrate', 'pressure'))
+        self.assertEqual((fit['slope'], fit['intercept'], fit['r_squared']), (2.0, 1.0, 1.0))
+
+        by_type = {group['type']: group for group in data['by_type']}
+        self.assertEqual(by_type['Pump']['count'], 3)
+        # A single row has nothing to correlate
+        self.assertEqual(by_type['Valve'], {'type': 'Valve', 'count': 1, 'pearson': None,
+                                            'spearman': None, 'fits': []})
@@ -0,0 +1,38 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from api.diff import diff_key
+from .factories import clear_caches, make_dataset, make_user
+
+
+class DiffCacheTests(TestCase):
+    """Only diffs up to DIFF_CACHE_MAX_ROWS are kept in the cache"""
+
+    def setUp(self):
+        clear_caches()
+        self.user = make_user()
+        self.before = make_dataset(self.user, b'A,Pump,1,2,3\nB,Valve,4,5,6\nC,Pump,7,8,9\n', 'before')
+        self.after = make_dataset(self.user, b'A,Pump,1.5,2,3\nB,Reactor,4,5,6\nD,Pump,7,8,9\n', 'after')
+        self.client.force_login(self.user)
+        self.url = f'/api/datasets/{self.before.id}/diff/?other={self.after.id}'
+
+    def test_records_and_counts(self):
+        data = self.client.get(self.url).json()
+        self.assertEqual(data['counts'], {'added': 1, 'removed': 1, 'changed': 2, 'unchanged': 0})
+        records = {record['equipment_name']: record for record in data['results']}
+        self.assertEqual(records['A']['deltas'], {'flowrate': 0.5, 'pressure': 0.0, 'temperature': 0.0})
+        self.assertEqual(records['B']['previous_type'], 'Valve')
+        self.assertIsNone(records['C']['after'])
+        self.assertIsNone(records['D']['before'])
+        self.assertEqual([record['status'] for record in data['results']],
+                         ['added', 'changed', 'changed', 'removed'])
+
+    def test_small_diff_is_cached(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.assertEqual(len(cache.get(diff_key(self.before, self.after, 0.0))), 4)
+
+    @override_settings(DIFF_CACHE_MAX_ROWS=3)
+    def test_long_diff_is_not_cached(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.assertIsNone(cache.get(diff_key(self.before, self.after, 0.0)))
+        filtered = self.client.get(f'{self.url}&status=removed').json()
+        self.assertEqual([record['equipment_name'] for record in filtered['results']], ['C'])
@@ -0,0 +1,79 @@
+import io
+import json
+import zipfile
+from unittest import skipIf
+from django.test import TestCase, override_settings
+from api.exports import pa, pq
+from api.models import Dataset
+from api.reports import ZipStreamBuffer
+from .factories import HEADER, ROWS, make_dataset, make_user
+
+
+@override_settings(EXPORT_CHUNK_SIZE=2)
+class TextExportTests(TestCase):
+    """CSV and NDJSON exports stream every row, ordered by name, across chunks"""
+
+    def setUp(self):
+        self.user = make_user()
+        self.dataset = make_dataset(self.user, b'C,Pump,7,8,9\n' + ROWS)
+        self.client.force_login(self.user)
+
+    def export(self, export_format):
+        response = self.client.get(f'/api/datasets/{self.dataset.id}/export/?format={export_format}')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f'equipment_{self.dataset.id}.{export_format}', response['Content-Disposition'])
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_csv_can_be_uploaded_again(self):
+        self.assertEqual(self.export('csv').splitlines(), [
+            HEADER.decode().strip(), 'A,Pump,1.0,2.0,3.0', 'B,Valve,4.0,5.0,6.0', 'C,Pump,7.0,8.0,9.0'
+        ])
+
+    def test_ndjson(self):
+        rows = [json.loads(line) for line in self.export('ndjson').splitlines()]
+        self.assertEqual([row['equipment_name'] for row in rows], ['A', 'B', 'C'])
+        self.assertEqual(rows[1], {'equipment_name': 'B', 'equipment_type': 'Valve',
+                                   'flowrate': 4.0, 'pressure': 5.0, 'temperature': 6.0})
+
+
+@skipIf(pa is None, 'pyarrow is not installed')
+@override_settings(ARROW_BATCH_SIZE=2)
+class ArrowExportTests(TestCase):
+    """Arrow and Parquet exports encode types from the rows themselves"""
+
+    def setUp(self):
+        self.user = make_user()
+        self.dataset = make_dataset(self.user, ROWS + b'C,Pump,7,8,9\n')
+        # A type the stored summary does not list must still be exported
+        Dataset.objects.filter(pk=self.dataset.pk).update(equipment_types={'Pump': 2})
+        self.client.force_login(self.user)
+
+    def export(self, export_format):
+        response = self.client.get(f'/api/datasets/{self.dataset.id}/export/?format={export_format}')
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def check(self, table):
+        self.assertEqual(table.column('equipment_name').to_pylist(), ['A', 'B', 'C'])
+        self.assertEqual(table.column('equipment_type').to_pylist(), ['Pump', 'Valve', 'Pump'])
+        self.assertEqual(table.column('temperature').to_pylist(), [3.0, 6.0, 9.0])
+
+    def test_arrow(self):
+        self.check(pa.ipc.open_stream(self.export('arrow')).read_all())
+
+    def test_parquet(self):
+        self.check(pq.read_table(io.BytesIO(self.export('parquet'))))
+
+
+class ZipStreamBufferTests(TestCase):
+
+    def test_zip_written_front_to_back(self):
+        buffer = ZipStreamBuffer()
+        data = b''
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            for name in ('a.txt', 'b.txt'):
+                archive.writestr(name, name * 100)
+                data += buffer.drain()
+        data += buffer.drain()
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            self.assertEqual(archive.read('b.txt'), b'b.txt' * 100)
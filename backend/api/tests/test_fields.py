@@ -0,0 +1,31 @@
+from django.test import TestCase, override_settings
+from .factories import make_dataset, make_user
+
+
+# The browsable API links static files that tests never collect
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class SparseFieldsetTests(TestCase):
+    """Unknown ?fields=/?exclude= names are a 400 in every format"""
+
+    def setUp(self):
+        self.user = make_user()
+        self.dataset = make_dataset(self.user)
+        self.client.force_login(self.user)
+
+    def test_unknown_field(self):
+        for url in ('/api/datasets/', f'/api/datasets/{self.dataset.id}/',
+                    f'/api/datasets/{self.dataset.id}/equipment/'):
+            for query in ('fields=bogus', 'exclude=bogus'):
+                for accept in ('application/json', 'text/html'):
+                    with self.subTest(url=url, query=query, accept=accept):
+                        response = self.client.get(f'{url}?{query}', HTTP_ACCEPT=accept)
+                        self.assertEqual(response.status_code, 400)
+                        self.assertIn(b'Unknown field(s): bogus', response.content)
+
+    def test_known_fields(self):
+        response = self.client.get(
+            f'/api/datasets/{self.dataset.id}/equipment/?fields=equipment_name', HTTP_ACCEPT='text/html'
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(f'/api/datasets/{self.dataset.id}/equipment/?fields=equipment_name')
+        self.assertEqual(list(response.json()['results'][0]), ['equipment_name'])
@@ -0,0 +1,70 @@
+import io
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from api.ingest import ingest_csv, ingest_frame, prepare_frame, read_csv_chunks
+from api.management.commands._synthetic import make_frame
+from api.models import Dataset, IngestJob
+from .factories import HEADER, make_user, temp_dir, use_settings
+
+
+class ChunkedIngestTests(TestCase):
+    """Streaming a CSV in chunks stores what a single pass would"""
+
+    def rows(self, dataset):
+        return list(dataset.equipment.order_by('id').values_list(
+            'equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature'
+        ))
+
+    def test_chunks_match_a_single_pass(self):
+        frame = make_frame(500, seed=1)
+        user = make_user()
+        whole = ingest_frame(Dataset.objects.create(user=user, name='whole'), prepare_frame(frame))
+        chunked = ingest_csv(
+            Dataset.objects.create(user=user, name='chunked'),
+            io.BytesIO(frame.to_csv(index=False).encode('utf-8')), chunksize=64, batch_size=50
+        )
+        self.assertTrue(chunked.is_ready)
+        self.assertEqual(chunked.total_count, 500)
+        self.assertEqual(chunked.equipment_types, whole.equipment_types)
+        for field in ('avg_flowrate', 'avg_pressure', 'avg_temperature'):
+            self.assertAlmostEqual(getattr(chunked, field), getattr(whole, field))
+        self.assertEqual(self.rows(chunked), self.rows(whole))
+        parameters = chunked.statistics.parameters
+        for field, expected in whole.statistics.parameters.items():
+            self.assertAlmostEqual(parameters[field]['std'], expected['std'])
+
+
+class BlankTextCellTests(TestCase):
+    """Rows without a name or type are rejected, not stored as 'nan'"""
+
+    def setUp(self):
+        use_settings(self, MEDIA_ROOT=temp_dir(self), INGEST_WORKERS=0)
+        self.user = make_user()
+        self.client.force_login(self.user)
+
+    def test_upload_with_a_blank_type(self):
+        csv = HEADER + b'A,Pump,1,2,3\nB,,4,5,6\nC,Valve,7,8,9\n'
+        response = self.client.post(
+            '/api/datasets/upload/', {'file': SimpleUploadedFile('blank.csv', csv, 'text/csv')}
+        )
+        job = IngestJob.objects.get(user=self.user)
+        self.assertEqual(job.status, IngestJob.STATUS_FAILED, response.content)
+        self.assertIn('Missing equipment_type value on line(s) 3', job.error)
+        self.assertFalse(Dataset.objects.exists())
+
+    def test_line_numbers_span_chunks(self):
+        csv = HEADER + b'A,Pump,1,2,3\nB,Pump,4,5,6\n   ,Valve,7,8,9\n'
+        with self.assertRaisesMessage(ValueError, 'Missing equipment_name value on line(s) 4'):
+            list(read_csv_chunks(io.BytesIO(csv), chunksize=2))
+
+
+class NonFiniteValueTests(TestCase):
+    """Parameters must be finite numbers"""
+
+    def test_infinite_values_are_rejected(self):
+        csv = HEADER + b'A,Pump,1,2,3\nB,Pump,inf,5,6\nC,Pump,7,1e999,9\n'
+        with self.assertRaisesMessage(ValueError, 'Invalid flowrate value on line(s) 3'):
+            list(read_csv_chunks(io.BytesIO(csv)))
+        csv = HEADER + b'C,Pump,7,1e999,9\n'
+        with self.assertRaisesMessage(ValueError, 'Invalid pressure value on line(s) 2'):
+            list(read_csv_chunks(io.BytesIO(csv)))
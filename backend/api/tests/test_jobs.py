@@ -0,0 +1,133 @@
+from datetime import timedelta
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.utils import timezone
+from api.jobs import fail_stale_ingest_jobs, fail_stale_report_jobs, run_ingest_job, run_report_job
+from api.models import Dataset, IngestJob, ReportJob
+from .factories import CSV, make_dataset, make_user, temp_dir, use_settings
+
+
+class StaleIngestJobTests(TestCase):
+    """Jobs orphaned by a restart are failed and their datasets removed"""
+
+    def setUp(self):
+        use_settings(self, MEDIA_ROOT=temp_dir(self), INGEST_JOB_TIMEOUT=600)
+        self.user = make_user()
+
+    def make_job(self, age, status=IngestJob.STATUS_PENDING):
+        dataset = Dataset.objects.create(user=self.user, name='upload')
+        dataset.file.save('upload.csv', ContentFile(CSV))
+        job = IngestJob.objects.create(user=self.user, dataset=dataset, status=status)
+        IngestJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - age)
+        return job, dataset
+
+    def test_stale_jobs_fail_and_drop_their_dataset(self):
+        pending, pending_dataset = self.make_job(timedelta(hours=1))
+        running, running_dataset = self.make_job(timedelta(hours=1), IngestJob.STATUS_RUNNING)
+        path = pending_dataset.file.path
+
+        self.assertEqual(fail_stale_ingest_jobs(), 2)
+
+        for job in (pending, running):
+            job.refresh_from_db()
+            self.assertEqual(job.status, IngestJob.STATUS_FAILED)
+            self.assertIsNone(job.dataset)
+        self.assertFalse(Dataset.objects.filter(pk__in=[pending_dataset.pk, running_dataset.pk]).exists())
+        self.assertFalse(pending_dataset.file.storage.exists(path))
+
+    def test_recent_jobs_are_kept(self):
+        job, dataset = self.make_job(timedelta(seconds=5))
+        self.assertEqual(fail_stale_ingest_jobs(), 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, IngestJob.STATUS_PENDING)
+        # Unless every active job is known to be orphaned (server start)
+        self.assertEqual(fail_stale_ingest_jobs(timeout=0), 1)
+
+    def test_worker_skips_a_job_failed_while_queued(self):
+        job, dataset = self.make_job(timedelta(hours=1))
+        fail_stale_ingest_jobs()
+        run_ingest_job(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, IngestJob.STATUS_FAILED)
+
+    def test_worker_runs_a_pending_job(self):
+        job, dataset = self.make_job(timedelta(seconds=0))
+        run_ingest_job(job.pk)
+        job.refresh_from_db()
+        dataset.refresh_from_db()
+        self.assertEqual(job.status, IngestJob.STATUS_COMPLETED)
+        self.assertTrue(dataset.is_ready)
+
+
+class IngestJobEndpointTests(TestCase):
+    """Uploads are polled through /api/jobs/, by their owner only"""
+
+    def setUp(self):
+        use_settings(self, MEDIA_ROOT=temp_dir(self), INGEST_WORKERS=0)
+        self.user = make_user()
+        self.client.force_login(self.user)
+
+    def test_poll_an_upload(self):
+        response = self.client.post(
+            '/api/datasets/upload/', {'file': SimpleUploadedFile('data.csv', CSV, 'text/csv')}
+        )
+        job_id = response.json()['job']['id']
+
+        job = self.client.get(f'/api/jobs/{job_id}/').json()
+        self.assertEqual(job['status'], IngestJob.STATUS_COMPLETED)
+        self.assertEqual(job['dataset'], IngestJob.objects.get(pk=job_id).dataset_id)
+        self.assertEqual([item['id'] for item in self.client.get('/api/jobs/').json()['results']], [job_id])
+
+        self.client.force_login(make_user('other'))
+        self.assertEqual(self.client.get(f'/api/jobs/{job_id}/').status_code, 404)
+
+
+class StaleReportJobTests(TestCase):
+    """Report jobs the pool lost are replaced, and only POST queues one"""
+
+    def setUp(self):
+        # Queued jobs stay pending: on_commit never fires inside a TestCase
+        use_settings(self, REPORT_CACHE_DIR=temp_dir(self), REPORT_WORKERS=1, REPORT_JOB_TIMEOUT=600)
+        self.user = make_user()
+        self.dataset = make_dataset(self.user)
+        self.url = f'/api/datasets/{self.dataset.id}/report/'
+        self.client.force_login(self.user)
+
+    def age(self, job, age):
+        ReportJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - age)
+
+    def test_get_does_not_queue_a_job(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(ReportJob.objects.exists())
+
+    def test_get_reports_the_job_queued_by_post(self):
+        queued = self.client.post(self.url)
+        self.assertEqual(queued.status_code, 202)
+        job_id = queued.json()['job']['id']
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['job']['id'], job_id)
+        self.assertEqual(self.client.post(self.url).json()['job']['id'], job_id)
+        self.assertEqual(ReportJob.objects.count(), 1)
+
+    def test_stale_job_is_failed_and_replaced(self):
+        job_id = self.client.post(self.url).json()['job']['id']
+        self.age(ReportJob.objects.get(pk=job_id), timedelta(hours=1))
+
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, 202)
+        self.assertNotEqual(response.json()['job']['id'], job_id)
+        self.assertEqual(ReportJob.objects.get(pk=job_id).status, ReportJob.STATUS_FAILED)
+
+    def test_worker_skips_a_job_failed_while_queued(self):
+        job = ReportJob.objects.create(user=self.user, dataset=self.dataset)
+        self.age(job, timedelta(hours=1))
+        self.assertEqual(fail_stale_report_jobs(), 1)
+        run_report_job(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ReportJob.STATUS_FAILED)
+        self.assertEqual(job.file_path, '')
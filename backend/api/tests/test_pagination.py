@@ -0,0 +1,56 @@
+import base64
+import json
+from django.test import TestCase
+from .factories import make_synthetic_dataset, make_user
+
+
+def cursor(position):
+    return base64.urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('ascii')
+
+
+class KeysetCursorTests(TestCase):
+    """Cursors with the right shape but wrong value types are rejected with 404"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user()
+        cls.dataset = make_synthetic_dataset(cls.user)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def get(self, action, position):
+        return self.client.get(
+            f'/api/datasets/{self.dataset.id}/{action}/', {'cursor': cursor(position)}
+        )
+
+    def test_equipment_cursor(self):
+        response = self.client.get(f'/api/datasets/{self.dataset.id}/equipment/', {'page_size': 5})
+        next_cursor = response.json()['next_cursor']
+        self.assertEqual(self.client.get(
+            f'/api/datasets/{self.dataset.id}/equipment/', {'cursor': next_cursor}
+        ).status_code, 200)
+        for position in (['Unit-1', 'x'], ['Unit-1', 1.5], [1, 2], ['Unit-1', True],
+                         ['Unit-1', None], ['Unit-1', 2 ** 70], [['a'], 1]):
+            with self.subTest(position=position):
+                self.assertEqual(self.get('equipment', position).status_code, 404)
+
+    def test_equipment_pages_cover_every_row_once(self):
+        names, params = [], {'page_size': 33}
+        while True:
+            page = self.client.get(f'/api/datasets/{self.dataset.id}/equipment/', params).json()
+            names += [row['equipment_name'] for row in page['results']]
+            if page['next_cursor'] is None:
+                break
+            params['cursor'] = page['next_cursor']
+        self.assertEqual(names, sorted(self.dataset.equipment.values_list('equipment_name', flat=True)))
+
+    def test_anomaly_cursor(self):
+        response = self.client.get(f'/api/datasets/{self.dataset.id}/anomalies/', {'page_size': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get('anomalies', [3.5, 1]).status_code, 200)
+        self.assertEqual(self.get('anomalies', [3, 1]).status_code, 200)
+        for position in ([3.5, 'x'], ['high', 1], [None, 1], [3.5, 1.5], [True, 1], [3.5, 2 ** 70],
+                         [float('nan'), 1], [float('inf'), 1]):
+            with self.subTest(position=position):
+                self.assertEqual(self.get('anomalies', position).status_code, 404)
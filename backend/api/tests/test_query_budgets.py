@@ -0,0 +1,115 @@
+"""
+Query-count budgets of the API endpoints.
+
+Counts include the session and user lookups every authenticated request
+makes (plus the response cache version read by cached actions) and must
+not grow with the number of datasets or rows.
+"""
+from django.test import TestCase
+from unittest import skipIf
+from api.exports import pa
+from api.models import IngestJob, ReportJob
+from .factories import clear_caches, make_synthetic_dataset, make_user
+
+DATASETS = 5  # kept at MAX_DATASETS so retention does not prune any
+ROWS = 250
+
+
+class QueryBudgetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = make_user()
+        for i in range(DATASETS):
+            dataset = make_synthetic_dataset(cls.user, rows=ROWS, seed=i, name=f'budget-{i}')
+        cls.dataset = dataset
+        cls.other = cls.user.datasets.exclude(id=dataset.id).first()
+        cls.job = IngestJob.objects.create(user=cls.user, dataset=dataset,
+                                           status=IngestJob.STATUS_COMPLETED)
+        cls.report_job = ReportJob.objects.create(user=cls.user, dataset=dataset)
+
+    def setUp(self):
+        # Measure cold requests, not response/chart/diff cache hits
+        clear_caches()
+        self.client.force_login(self.user)
+        self.url = f'/api/datasets/{self.dataset.id}'
+
+    def assertQueries(self, budget, url):
+        with self.assertNumQueries(budget):
+            response = self.client.get(url)
+            if response.streaming:
+                # Streaming bodies run their queries while being consumed
+                b''.join(response.streaming_content)
+        self.assertLess(response.status_code, 400, url)
+
+    def test_dataset_list(self):
+        self.assertQueries(5, '/api/datasets/')
+
+    def test_dataset_list_fields(self):
+        self.assertQueries(5, '/api/datasets/?fields=id,name,total_count')
+
+    def test_dataset_compare(self):
+        ids = ','.join(str(pk) for pk in self.user.datasets.values_list('id', flat=True))
+        self.assertQueries(3, f'/api/datasets/compare/?ids={ids}')
+
+    def test_dataset_detail(self):
+        self.assertQueries(4, f'{self.url}/')
+
+    def test_dataset_summary(self):
+        self.assertQueries(4, f'{self.url}/summary/')
+
+    def test_type_statistics(self):
+        self.assertQueries(3, f'{self.url}/type_statistics/')
+
+    def test_chart_data(self):
+        self.assertQueries(5, f'{self.url}/chart_data/')
+
+    def test_dataset_diff(self):
+        self.assertQueries(6, f'{self.url}/diff/?other={self.other.id}')
+
+    def test_correlations(self):
+        self.assertQueries(5, f'{self.url}/correlations/')
+
+    def test_anomalies(self):
+        self.assertQueries(4, f'{self.url}/anomalies/')
+
+    def test_anomalies_by_flag(self):
+        self.assertQueries(4, f'{self.url}/anomalies/?flag=iqr')
+
+    def test_equipment_page(self):
+        self.assertQueries(4, f'{self.url}/equipment/')
+
+    def test_equipment_fields(self):
+        self.assertQueries(4, f'{self.url}/equipment/?fields=equipment_name,flowrate')
+
+    def test_equipment_columnar(self):
+        self.assertQueries(4, f'{self.url}/equipment/?format=columnar')
+
+    def test_csv_export(self):
+        self.assertQueries(4, f'{self.url}/export/?format=csv')
+
+    def test_ndjson_export(self):
+        self.assertQueries(4, f'{self.url}/export/?format=ndjson')
+
+    @skipIf(pa is None, 'pyarrow is not installed')
+    def test_arrow_export(self):
+        self.assertQueries(4, f'{self.url}/export/?format=arrow')
+
+    @skipIf(pa is None, 'pyarrow is not installed')
+    def test_parquet_export(self):
+        self.assertQueries(4, f'{self.url}/export/?format=parquet')
+
+    def test_job_list(self):
+        self.assertQueries(4, '/api/jobs/')
+
+    def test_job_detail(self):
+        self.assertQueries(3, f'/api/jobs/{self.job.id}/')
+
+    def test_report_job_detail(self):
+        self.assertQueries(3, f'/api/report-jobs/{self.report_job.id}/')
+
+    def test_trends(self):
+        self.assertQueries(3, '/api/trends/')
+
+    def test_trends_by_range(self):
+        self.assertQueries(4, '/api/trends/?start=2000-01-01&end=2100-12-31')
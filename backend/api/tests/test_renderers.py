@@ -0,0 +1,52 @@
+import datetime
+import json
+from decimal import Decimal
+import numpy as np
+from django.test import SimpleTestCase
+from rest_framework.renderers import JSONRenderer
+from api.models import EquipmentData
+from api.renderers import FastJSONRenderer
+from api.serializers import EquipmentDataSerializer
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    """FastJSONRenderer renders what JSONRenderer does"""
+
+    payloads = [
+        None,
+        {'count': 2, 'next': None, 'results': [{'name': 'Pump-1', 'flowrate': 120.5}]},
+        [1, 2.25, -0.0, 0.1, True, False, None, 'text'],
+        {'unicode': 'café     \U0001F600', 'nested': {'a': [[], {}]}},
+        {'when': datetime.datetime(2024, 1, 2, 3, 4, 5), 'day': datetime.date(2024, 1, 2)},
+        {'decimal': Decimal('1.50'), 'array': np.array([1.5, 2.0]), 'ints': np.arange(3)},
+    ]
+    def test_same_bytes(self):
+        for data in self.payloads:
+            with self.subTest(data=data):
+                self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_exponents_are_formatted_differently(self):
+        # orjson writes 1e300 where json writes 1e+300; the numbers are equal
+        data = [1e300, 1.5e-7, -2e22]
+        fast, drf = FastJSONRenderer().render(data), JSONRenderer().render(data)
+        self.assertNotEqual(fast, drf)
+        self.assertEqual(json.loads(fast), json.loads(drf))
+
+    def test_non_finite_floats_become_null(self):
+        # Documented difference: JSONRenderer raises, the data is not scanned
+        data = {'value': float('nan'), 'results': [float('inf')]}
+        with self.assertRaises(ValueError):
+            JSONRenderer().render(data)
+        self.assertEqual(FastJSONRenderer().render(data), b'{"value":null,"results":[null]}')
+
+
+class FiniteFloatFieldTests(SimpleTestCase):
+    """Model float fields refuse what FastJSONRenderer would turn into null"""
+
+    def test_non_finite_values_raise(self):
+        row = EquipmentData(equipment_name='A', equipment_type='Pump',
+                            flowrate=1.5, pressure=float('inf'), temperature=3.0)
+        with self.assertRaisesMessage(ValueError, 'pressure'):
+            EquipmentDataSerializer(row).data
+        row.pressure = 2.0
+        self.assertEqual(EquipmentDataSerializer(row).data['pressure'], 2.0)
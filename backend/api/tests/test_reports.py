@@ -0,0 +1,49 @@
+import io
+import zipfile
+from django.test import TestCase
+from api.models import ReportJob
+from api.reports import report_path
+from .factories import make_dataset, make_user, temp_dir, use_settings
+
+
+class BulkReportTests(TestCase):
+    """Bulk exports stream one cached PDF per dataset in a ZIP"""
+
+    def setUp(self):
+        # Build reports and charts in-line
+        use_settings(self, REPORT_CACHE_DIR=temp_dir(self), REPORT_WORKERS=0, CHART_WORKERS=0)
+        self.user = make_user()
+        self.datasets = [make_dataset(self.user, name=f'report-{i}') for i in range(2)]
+        self.client.force_login(self.user)
+
+    def bulk_report(self, ids):
+        return self.client.post('/api/datasets/bulk_report/', {'ids': ids}, content_type='application/json')
+
+    def test_zip_holds_a_pdf_per_dataset(self):
+        response = self.bulk_report([dataset.id for dataset in self.datasets])
+        self.assertEqual(response.status_code, 200)
+        with zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content))) as archive:
+            self.assertEqual(archive.namelist(), [
+                f'equipment_report_{dataset.id}.pdf' for dataset in self.datasets
+            ])
+            for name in archive.namelist():
+                self.assertTrue(archive.read(name).startswith(b'%PDF'))
+
+    def test_built_reports_are_reused(self):
+        dataset = self.datasets[0]
+        b''.join(self.bulk_report([dataset.id]).streaming_content)
+        self.assertTrue(report_path(dataset).exists())
+
+        # The PDF the bulk export cached is served without queueing a job
+        url = f'/api/datasets/{dataset.id}/report/'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['job']['status'], ReportJob.STATUS_COMPLETED)
+
+    def test_unknown_ids(self):
+        response = self.bulk_report([self.datasets[0].id, 999999])
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('999999', response.json()['error'])
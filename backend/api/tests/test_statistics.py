@@ -0,0 +1,53 @@
+import pandas as pd
+from django.test import TestCase
+from api.statistics import aggregate_by_type, aggregate_parameters, build_statistics
+from .factories import make_dataset, make_user
+
+
+class SingleRowStatisticsTests(TestCase):
+    """Groups of one row have no sample deviation; SQLite must not fail on them"""
+
+    def setUp(self):
+        self.user = make_user()
+
+    def ingest(self, rows):
+        return make_dataset(self.user, rows)
+
+    def test_type_with_a_single_row(self):
+        dataset = self.ingest('A,Pump,1,2,3\nB,Valve,4,5,6\nC,Valve,7,8,9\n')
+        by_type = {row['type']: row for row in aggregate_by_type(dataset)}
+        self.assertEqual(by_type['Pump']['count'], 1)
+        self.assertEqual(by_type['Pump']['flowrate']['std'], 0)
+        self.assertAlmostEqual(by_type['Valve']['flowrate']['std'], 2.1213203, places=6)
+
+    def test_single_row_dataset(self):
+        dataset = self.ingest('A,Pump,1,2,3\n')
+        self.assertTrue(dataset.is_ready)
+        parameters = aggregate_parameters(dataset)
+        self.assertEqual(parameters['flowrate']['count'], 1)
+        self.assertEqual(parameters['flowrate']['std'], 0)
+        # Rebuilding from the database (as after a STATS_VERSION bump) works too
+        statistics = build_statistics(dataset)
+        self.assertEqual(statistics.parameters['pressure']['median'], 2.0)
+
+    def test_sample_std_matches_ingest(self):
+        dataset = self.ingest('A,Pump,1,2,3\nB,Pump,4,5,6\nC,Valve,7,8,10\n')
+        ingested = dataset.statistics.parameters
+        rebuilt = aggregate_parameters(dataset)
+        for field in ('flowrate', 'pressure', 'temperature'):
+            self.assertAlmostEqual(rebuilt[field]['std'], ingested[field]['std'])
+
+
+class QuartileTests(TestCase):
+    """Quartiles read from the database match pandas' linear interpolation"""
+
+    def test_matches_pandas(self):
+        rows = ''.join(
+            f'U{i},Pump,{(i * 7) % 11},{i % 3},{(i * 13) % 17 / 2}\n' for i in range(23)
+        )
+        dataset = make_dataset(make_user(), rows)
+        frame = pd.DataFrame(list(dataset.equipment.values('flowrate', 'pressure', 'temperature')))
+        parameters = dataset.statistics.parameters
+        for field in frame:
+            for key, q in (('q1', 0.25), ('median', 0.5), ('q3', 0.75)):
+                self.assertAlmostEqual(parameters[field][key], frame[field].quantile(q))
@@ -0,0 +1,54 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from api.models import DatasetTrendPoint
+from .factories import make_dataset, make_user
+
+
+class TrendTests(TestCase):
+    """Trend points keep rolling aggregates and outlive their datasets"""
+
+    def setUp(self):
+        self.user = make_user()
+        self.datasets = [
+            make_dataset(self.user, rows, name=f'trend-{i}')
+            for i, rows in enumerate(['A,Pump,1,2,3\n', 'A,Pump,3,4,5\nB,Valve,5,6,7\n', 'C,Valve,9,8,7\n'])
+        ]
+        # One upload a day, oldest first
+        now = timezone.now()
+        for age, dataset in zip((2, 1, 0), self.datasets):
+            DatasetTrendPoint.objects.filter(dataset=dataset).update(recorded_at=now - timedelta(days=age))
+        self.client.force_login(self.user)
+
+    def trends(self, **params):
+        response = self.client.get('/api/trends/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_rolling_window(self):
+        data = self.trends(window=2)
+        self.assertEqual(data['count'], 3)
+        self.assertEqual(data['type_mix'], {'Pump': 2, 'Valve': 2})
+        last = data['points'][-1]
+        self.assertEqual(last['dataset_id'], self.datasets[2].id)
+        self.assertEqual(last['rolling']['datasets'], 2)
+        self.assertEqual(last['rolling']['total_count'], 3)
+        # Row-weighted mean of (3 + 5) and 9, extremes over both datasets
+        self.assertEqual(last['rolling']['flowrate'], {'mean': 5.67, 'min': 3.0, 'max': 9.0})
+
+    def test_range_uses_earlier_points_for_the_window(self):
+        today = timezone.localdate()
+        data = self.trends(start=today.isoformat(), window=3)
+        self.assertEqual(data['count'], 1)
+        self.assertEqual(data['points'][0]['rolling']['datasets'], 3)
+        self.assertEqual(data['points'][0]['rolling']['total_count'], 4)
+
+    def test_points_outlive_their_datasets(self):
+        self.datasets[0].delete()
+        first = self.trends()['points'][0]
+        self.assertIsNone(first['dataset_id'])
+        self.assertEqual(first['dataset_name'], 'trend-0')
+
+    def test_start_after_end(self):
+        response = self.client.get('/api/trends/', {'start': '2024-02-02', 'end': '2024-02-01'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,61 @@
+import hashlib
+from datetime import timedelta
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.utils import timezone
+from api.models import Dataset, IngestJob
+from .factories import CSV, make_user, temp_dir, use_settings
+
+
+class UploadDeduplicationTests(TestCase):
+    """An identical upload follows an in-flight ingest only while it is alive"""
+
+    def setUp(self):
+        use_settings(self, MEDIA_ROOT=temp_dir(self), INGEST_WORKERS=0, INGEST_JOB_TIMEOUT=600)
+        self.user = make_user()
+        self.client.force_login(self.user)
+
+    def unfinished(self, age, status=IngestJob.STATUS_RUNNING):
+        dataset = Dataset.objects.create(
+            user=self.user, name='earlier', content_hash=hashlib.sha256(CSV).hexdigest()
+        )
+        dataset.file.save('earlier.csv', ContentFile(CSV))
+        job = IngestJob.objects.create(user=self.user, dataset=dataset, status=status)
+        IngestJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - age)
+        return dataset, job
+
+    def upload(self):
+        return self.client.post(
+            '/api/datasets/upload/', {'file': SimpleUploadedFile('data.csv', CSV, 'text/csv')}
+        )
+
+    def test_follows_a_live_ingest(self):
+        dataset, job = self.unfinished(timedelta(seconds=5))
+        response = self.upload()
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(response.json()['deduplicated'])
+        self.assertEqual(response.json()['job']['id'], str(job.pk))
+
+    def test_reingests_after_a_stale_ingest(self):
+        dataset, job = self.unfinished(timedelta(hours=1))
+        response = self.upload()
+        self.assertFalse(response.json()['deduplicated'])
+        self.assertEqual(response.json()['job']['status'], IngestJob.STATUS_COMPLETED)
+        self.assertFalse(Dataset.objects.filter(pk=dataset.pk).exists())
+        job.refresh_from_db()
+        self.assertEqual(job.status, IngestJob.STATUS_FAILED)
+
+    def test_reingests_when_no_job_is_active(self):
+        dataset, job = self.unfinished(timedelta(seconds=5), IngestJob.STATUS_FAILED)
+        response = self.upload()
+        self.assertFalse(response.json()['deduplicated'])
+        self.assertFalse(Dataset.objects.filter(pk=dataset.pk).exists())
+        self.assertEqual(Dataset.objects.filter(user=self.user, is_ready=True).count(), 1)
+
+    def test_reuses_a_ready_dataset(self):
+        self.upload()
+        response = self.upload()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['deduplicated'])
+        self.assertEqual(Dataset.objects.filter(user=self.user).count(), 1)
@@ -0,0 +1,108 @@
+"""
+Per-user history of dataset aggregates that outlives dataset retention
+"""
+from collections import Counter
+from datetime import datetime, time, timedelta
+import pandas as pd
+from django.utils import timezone
+from .models import DatasetTrendPoint
+from .statistics import NUMERIC_FIELDS
+
+DEFAULT_WINDOW = 5
+
+TREND_FIELDS = ['id', 'dataset_id', 'dataset_name', 'recorded_at', 'total_count', 'type_counts'] + [
+    f'{field}_{key}' for field in NUMERIC_FIELDS for key in ('mean', 'min', 'max')
+]
+
+
+def record_trend_point(dataset, statistics):
+    """
+    Store (or refresh) the trend point of a freshly ingested dataset
+    """
+    values = {
+        'user': dataset.user,
+        'dataset_name': dataset.name,
+        'recorded_at': dataset.uploaded_at,
+        'total_count': dataset.total_count,
+        'type_counts': dataset.equipment_types,
+    }
+    for field in NUMERIC_FIELDS:
+        for key in ('mean', 'min', 'max'):
+            values[f'{field}_{key}'] = statistics.parameters[field][key]
+    point, _ = DatasetTrendPoint.objects.update_or_create(dataset=dataset, defaults=values)
+    return point
+
+
+def day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def range_filter(start=None, end=None):
+    """
+    recorded_at lookups for an inclusive range of dates, usable by the index
+    """
+    lookups = {}
+    if start is not None:
+        lookups['recorded_at__gte'] = day_start(start)
+    if end is not None:
+        lookups['recorded_at__lt'] = day_start(end + timedelta(days=1))
+    return lookups
+
+
+def rolling_trends(points, window=DEFAULT_WINDOW, preceding=()):
+    """
+    Each trend point with aggregates over it and the window - 1 points
+    before it.
+
+    preceding holds up to window - 1 points from before the requested
+    range so the first points get full windows. Rolling means are weighted
+    by row count; extremes are the min of mins and max of maxes.
+    """
+    frame = pd.DataFrame.from_records(list(preceding) + list(points), columns=TREND_FIELDS)
+    if frame.empty:
+        return []
+
+    counts = frame['total_count']
+    rolling_count = counts.rolling(window, min_periods=1).sum()
+    rolling = {'total_count': rolling_count}
+    for field in NUMERIC_FIELDS:
+        weighted = (frame[f'{field}_mean'] * counts).rolling(window, min_periods=1).sum()
+        rolling[field] = {
+            'mean': (weighted / rolling_count.where(rolling_count > 0)).fillna(0.0),
+            'min': frame[f'{field}_min'].rolling(window, min_periods=1).min(),
+            'max': frame[f'{field}_max'].rolling(window, min_periods=1).max(),
+        }
+
+    results = []
+    for i in range(len(preceding), len(frame)):
+        row = frame.iloc[i]
+        results.append({
+            'dataset_id': None if pd.isna(row['dataset_id']) else int(row['dataset_id']),
+            'dataset_name': row['dataset_name'],
+            'recorded_at': row['recorded_at'],
+            'total_count': int(row['total_count']),
+            'type_counts': row['type_counts'],
+            **{
+                field: {key: round(float(row[f'{field}_{key}']), 2) for key in ('mean', 'min', 'max')}
+                for field in NUMERIC_FIELDS
+            },
+            'rolling': {
+                'datasets': min(i + 1, window),
+                'total_count': int(rolling['total_count'].iloc[i]),
+                **{
+                    field: {key: round(float(series.iloc[i]), 2) for key, series in rolling[field].items()}
+                    for field in NUMERIC_FIELDS
+                },
+            },
+        })
+    return results
+
+
+def type_mix(points):
+    """
+    Equipment type counts summed over trend points
+    """
+    mix = Counter()
+    for point in points:
+        mix.update(point['type_counts'])
+    return dict(mix.most_common())
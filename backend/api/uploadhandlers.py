@@ -0,0 +1,43 @@
+"""
+Upload handlers for dataset files
+"""
+import hashlib
+from django.core.files.uploadhandler import FileUploadHandler
+
+
+class ContentHashUploadHandler(FileUploadHandler):
+    """
+    Hash each uploaded file while its bytes stream in.
+
+    Chunks are passed through unchanged to the next handler, so it must be
+    listed first in FILE_UPLOAD_HANDLERS. Digests are stored per form field
+    on request.upload_hashes.
+    """
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.hasher = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.hasher.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        if not hasattr(self.request, 'upload_hashes'):
+            self.request.upload_hashes = {}
+        self.request.upload_hashes[self.field_name] = self.hasher.hexdigest()
+        # Let the next handler build the uploaded file object
+        return None
+
+
+def get_upload_hash(request, field_name, file):
+    """
+    Return the SHA-256 of an uploaded file, hashing it now if no handler did
+    """
+    digest = getattr(request, 'upload_hashes', {}).get(field_name)
+    if digest:
+        return digest
+    hasher = hashlib.sha256()
+    for chunk in file.chunks():
+        hasher.update(chunk)
+    return hasher.hexdigest()
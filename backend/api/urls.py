@@ -2,14 +2,21 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     DatasetViewSet,
+    IngestJobViewSet,
+    ReportJobViewSet,
+    TrendViewSet,
     register_user,
     login_user,
     logout_user,
-    current_user
+    current_user,
+    cache_stats
 )
 
 router = DefaultRouter()
 router.register(r'datasets', DatasetViewSet, basename='dataset')
+router.register(r'jobs', IngestJobViewSet, basename='job')
+router.register(r'report-jobs', ReportJobViewSet, basename='report-job')
+router.register(r'trends', TrendViewSet, basename='trend')
 
 urlpatterns = [
     # Authentication endpoints
@@ -18,6 +25,9 @@ urlpatterns = [
     path('auth/logout/', logout_user, name='logout'),
     path('auth/user/', current_user, name='current-user'),
     
+    # Response cache counters
+    path('cache/stats/', cache_stats, name='cache-stats'),
+    
     # Router URLs
     path('', include(router.urls)),
 ]
@@ -6,10 +6,14 @@ from io import BytesIO
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Image
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from reportlab.pdfbase.pdfdoc import PDFDictionary, PDFName, PDFStream, PDFZCompress
+from reportlab.pdfgen import canvas
 from datetime import datetime
+from itertools import chain
+from .charts import chart_size
 
 
 def process_csv_file(file_path):
@@ -33,11 +37,170 @@ def validate_csv_columns(df, required_columns):
     return True
 
 
-def generate_pdf_report(dataset):
+# Report styles are built once per process rather than on every report
+_STYLES = getSampleStyleSheet()
+
+TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_STYLES['Heading1'],
+    fontSize=24,
+    textColor=colors.HexColor('#1a237e'),
+    spaceAfter=30,
+    alignment=TA_CENTER
+)
+
+HEADING_STYLE = ParagraphStyle(
+    'CustomHeading',
+    parent=_STYLES['Heading2'],
+    fontSize=16,
+    textColor=colors.HexColor('#283593'),
+    spaceAfter=12,
+    spaceBefore=12
+)
+
+NORMAL_STYLE = _STYLES['Normal']
+
+INFO_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#e8eaf6')),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('GRID', (0, 0), (-1, -1), 1, colors.grey)
+])
+
+DATA_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3f51b5')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+EQUIPMENT_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3f51b5')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+
+# Rows per table in the full equipment listing; one table fills a letter page
+EQUIPMENT_ROWS_PER_TABLE = 36
+
+EQUIPMENT_HEADER = ['Name', 'Type', 'Flow', 'Pressure', 'Temp']
+EQUIPMENT_COL_WIDTHS = [2*inch, 1.5*inch, 1*inch, 1*inch, 1*inch]
+
+
+def equipment_row(name, eq_type, flowrate, pressure, temperature):
+    return [
+        name[:25],  # Truncate long names
+        eq_type[:15],
+        f"{flowrate:.1f}",
+        f"{pressure:.1f}",
+        f"{temperature:.1f}"
+    ]
+
+
+def equipment_table(rows):
+    table = Table([EQUIPMENT_HEADER] + rows, colWidths=EQUIPMENT_COL_WIDTHS, repeatRows=1)
+    table.setStyle(EQUIPMENT_TABLE_STYLE)
+    return table
+
+
+def iter_equipment_tables(dataset, rows_per_table=EQUIPMENT_ROWS_PER_TABLE):
+    """
+    Yield page-sized tables over every equipment row of a dataset.
+
+    Rows come from a server-side cursor, so only one table's worth of
+    rows is materialized at a time.
+    """
+    rows = (
+        dataset.equipment.order_by('equipment_name', 'id')
+        .values_list('equipment_name', 'equipment_type',
+                     'flowrate', 'pressure', 'temperature')
+        .iterator(chunk_size=rows_per_table * 50)
+    )
+    page = []
+    for row in rows:
+        page.append(equipment_row(*row))
+        if len(page) >= rows_per_table:
+            yield equipment_table(page)
+            page = []
+    if page:
+        yield equipment_table(page)
+
+
+class CompressedPageCanvas(canvas.Canvas):
+    """
+    Canvas that deflates each page's content stream as soon as it is done.
+
+    ReportLab keeps every page in memory until save() and only compresses
+    while writing, so long reports would otherwise hold all page text
+    uncompressed.
+    """
+
+    def showPage(self):
+        super().showPage()
+        page = self._doc.Pages.pages[-1]
+        if page.stream and not page.Contents:
+            # format() leaves streams that already name a Filter untouched
+            page.Contents = PDFStream(
+                PDFDictionary({'Filter': PDFName('FlateDecode')}),
+                PDFZCompress.encode(page.stream)
+            )
+            page.stream = None
+
+
+class LazyFlowables(list):
+    """
+    Flowable list that pulls items from an iterator as the build consumes it.
+
+    doc.build() pops flowables off the front of its list and may look a
+    few items ahead, so keeping a small buffer filled is enough; already
+    drawn flowables are released instead of living until the end.
+    """
+    lookahead = 4
+
+    def __init__(self, head, tail):
+        super().__init__(head)
+        self._tail = iter(tail)
+
+    def _fill(self):
+        while self._tail is not None and list.__len__(self) < self.lookahead:
+            try:
+                self.append(next(self._tail))
+            except StopIteration:
+                self._tail = None
+
+    def __len__(self):
+        self._fill()
+        return list.__len__(self)
+
+    def __getitem__(self, index):
+        self._fill()
+        return list.__getitem__(self, index)
+
+
+def generate_pdf_report(dataset, full=False, output=None, charts=None):
     """
     Generate PDF report for a dataset
+
+    With full=True every equipment row is listed instead of a 20 row
+    sample. The PDF is written to output (a path or binary file) if given,
+    otherwise to a returned BytesIO. charts is a list of (name, png path)
+    pairs from api.charts to embed.
     """
-    buffer = BytesIO()
+    buffer = BytesIO() if output is None else output
     doc = SimpleDocTemplate(buffer, pagesize=letter,
                            rightMargin=72, leftMargin=72,
                            topMargin=72, bottomMargin=18)
@@ -45,28 +208,8 @@ def generate_pdf_report(dataset):
     # Container for the 'Flowable' objects
     elements = []
     
-    # Define styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#1a237e'),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=16,
-        textColor=colors.HexColor('#283593'),
-        spaceAfter=12,
-        spaceBefore=12
-    )
-    
     # Title
-    title = Paragraph("Chemical Equipment Analysis Report", title_style)
+    title = Paragraph("Chemical Equipment Analysis Report", TITLE_STYLE)
     elements.append(title)
     elements.append(Spacer(1, 12))
     
@@ -79,22 +222,13 @@ def generate_pdf_report(dataset):
     ]
     
     info_table = Table(info_data, colWidths=[2*inch, 4*inch])
-    info_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#e8eaf6')),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey)
-    ]))
+    info_table.setStyle(INFO_TABLE_STYLE)
     
     elements.append(info_table)
     elements.append(Spacer(1, 20))
     
     # Summary Statistics
-    elements.append(Paragraph("Summary Statistics", heading_style))
+    elements.append(Paragraph("Summary Statistics", HEADING_STYLE))
     
     stats_data = [
         ['Parameter', 'Average', 'Unit'],
@@ -104,22 +238,13 @@ def generate_pdf_report(dataset):
     ]
     
     stats_table = Table(stats_data, colWidths=[2*inch, 2*inch, 2*inch])
-    stats_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3f51b5')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    stats_table.setStyle(DATA_TABLE_STYLE)
     
     elements.append(stats_table)
     elements.append(Spacer(1, 20))
     
     # Equipment Type Distribution
-    elements.append(Paragraph("Equipment Type Distribution", heading_style))
+    elements.append(Paragraph("Equipment Type Distribution", HEADING_STYLE))
     
     type_data = [['Equipment Type', 'Count', 'Percentage']]
     for eq_type, count in dataset.equipment_types.items():
@@ -127,65 +252,51 @@ def generate_pdf_report(dataset):
         type_data.append([eq_type, str(count), f"{percentage:.1f}%"])
     
     type_table = Table(type_data, colWidths=[2.5*inch, 1.5*inch, 1.5*inch])
-    type_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3f51b5')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    type_table.setStyle(DATA_TABLE_STYLE)
     
     elements.append(type_table)
     elements.append(Spacer(1, 20))
     
-    # Equipment Details (first 20 items)
-    elements.append(Paragraph("Equipment Details (Sample)", heading_style))
-    
-    equipment_data = [['Name', 'Type', 'Flow', 'Pressure', 'Temp']]
-    equipment_list = dataset.equipment.all()[:20]
-    
-    for eq in equipment_list:
-        equipment_data.append([
-            eq.equipment_name[:25],  # Truncate long names
-            eq.equipment_type[:15],
-            f"{eq.flowrate:.1f}",
-            f"{eq.pressure:.1f}",
-            f"{eq.temperature:.1f}"
-        ])
-    
-    eq_table = Table(equipment_data, colWidths=[2*inch, 1.5*inch, 1*inch, 1*inch, 1*inch])
-    eq_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3f51b5')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    
-    elements.append(eq_table)
-    
-    if dataset.total_count > 20:
-        elements.append(Spacer(1, 12))
-        note = Paragraph(
-            f"<i>Note: Showing 20 of {dataset.total_count} total equipment items</i>",
-            styles['Normal']
-        )
-        elements.append(note)
+    # Charts, pre-rendered and cached on disk
+    if charts:
+        elements.append(Paragraph("Charts", HEADING_STYLE))
+        for name, path in charts:
+            width, height = chart_size(name)
+            elements.append(Image(str(path), width=width*inch, height=height*inch))
+            elements.append(Spacer(1, 12))
+    
+    if full:
+        # Complete listing, built table by table while the document renders
+        elements.append(PageBreak())
+        elements.append(Paragraph("Equipment Details", HEADING_STYLE))
+        listing = iter_equipment_tables(dataset)
+    else:
+        # Equipment Details (first 20 items)
+        elements.append(Paragraph("Equipment Details (Sample)", HEADING_STYLE))
+        
+        equipment_list = dataset.equipment.values_list(
+            'equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature'
+        )[:20]
+        listing = [equipment_table([equipment_row(*row) for row in equipment_list])]
+        
+        if dataset.total_count > 20:
+            listing.append(Spacer(1, 12))
+            note = Paragraph(
+                f"<i>Note: Showing 20 of {dataset.total_count} total equipment items</i>",
+                NORMAL_STYLE
+            )
+            listing.append(note)
     
     # Footer
-    elements.append(Spacer(1, 30))
     footer_text = f"Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-    footer = Paragraph(footer_text, styles['Normal'])
-    elements.append(footer)
+    footer = Paragraph(footer_text, NORMAL_STYLE)
     
     # Build PDF
-    doc.build(elements)
+    doc.build(
+        LazyFlowables(elements, chain(listing, [Spacer(1, 30), footer])),
+        canvasmaker=CompressedPageCanvas
+    )
     
-    buffer.seek(0)
+    if output is None:
+        buffer.seek(0)
     return buffer
@@ -2,20 +2,39 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.settings import api_settings
 from django.contrib.auth import authenticate, login, logout
 from django.views.decorators.csrf import csrf_exempt
-from django.contrib.auth.models import User
-from django.http import HttpResponse
-from django.db.models import Avg, Count
-from .models import Dataset, EquipmentData
+from django.http import StreamingHttpResponse, FileResponse
+from django.utils import timezone
+from .models import Dataset, DatasetTrendPoint, IngestJob, ReportJob
 from .serializers import (
     UserSerializer, UserRegistrationSerializer,
     DatasetSerializer, DatasetListSerializer,
-    EquipmentDataSerializer, DatasetUploadSerializer
+    EquipmentDataSerializer, DatasetUploadSerializer,
+    IngestJobSerializer, ReportJobSerializer, BulkReportSerializer,
+    ChartDataQuerySerializer, AnomalySerializer, AnomalyQuerySerializer,
+    ComparisonQuerySerializer, DiffQuerySerializer, TrendQuerySerializer
 )
-from .utils import process_csv_file, generate_pdf_report
-import pandas as pd
-import json
+from .ingest import validate_csv_header
+from .jobs import (
+    fail_stale_ingest_jobs, fail_stale_report_jobs,
+    submit_ingest_job, submit_report_job, iter_built_reports
+)
+from .uploadhandlers import get_upload_hash
+from .statistics import get_statistics
+from .chart_data import get_chart_data
+from .correlations import get_correlations
+from .comparison import compare_datasets
+from .diff import DiffRows, diff_counts, get_diff
+from .trends import TREND_FIELDS, range_filter, rolling_trends, type_mix
+from .cache import cache_response, conditional_dataset_response, remember_validators, response_cache
+from .pagination import EquipmentKeysetPagination, AnomalyKeysetPagination, DiffPagination
+from .anomalies import FLAGS, flag_values
+from .renderers import ArrowRenderer, ColumnarJSONRenderer, CSVRenderer, NDJSONRenderer, ParquetRenderer
+from .exports import ARROW_FORMATS, EXPORT_STREAMS, pa
+from .reports import report_filename, report_path, stream_report_zip
+import os
 
 
 @api_view(['POST'])
@@ -78,21 +97,59 @@ def current_user(request):
         return Response({'error': 'Not authenticated'}, status=status.HTTP_401_UNAUTHORIZED)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def cache_stats(request):
+    """Get response cache hit/miss counts"""
+    return Response(response_cache.stats())
+
+
 class DatasetViewSet(viewsets.ModelViewSet):
     """ViewSet for Dataset operations"""
     # Using default permission classes from settings (AllowAny)
     
+    # Actions that read the precomputed DatasetStatistics row
+    statistics_actions = ('summary', 'type_statistics', 'anomalies', 'correlations', 'compare')
+    
     def get_serializer_class(self):
         if self.action == 'list':
             return DatasetListSerializer
         return DatasetSerializer
     
     def get_queryset(self):
-        # Return only user's datasets
+        # Return only user's datasets whose ingest has committed
         if self.request.user.is_authenticated:
-            return Dataset.objects.filter(user=self.request.user)
+            queryset = Dataset.objects.filter(
+                user=self.request.user, is_ready=True
+            ).select_related('user')
+            if self.action in self.statistics_actions:
+                queryset = queryset.select_related('statistics')
+            elif self.action in ('list', 'retrieve'):
+                # Honour ?fields=/?exclude= down to the SELECT; get_object
+                # reads the validators of conditional GETs
+                queryset = self.get_serializer_class().project(
+                    queryset, self.request, always=('id', 'uploaded_at', 'content_hash')
+                )
+            return queryset
         return Dataset.objects.none()
     
+    def get_object(self):
+        dataset = super().get_object()
+        # Lets conditional GETs of this dataset skip their own lookup
+        remember_validators(self.request, dataset)
+        return dataset
+    
+    # Datasets never change after ingest; any upload or deletion bumps the
+    # user's cache version (see api.signals)
+    @cache_response
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
+    @conditional_dataset_response
+    @cache_response
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+    
     @action(detail=False, methods=['post'], permission_classes=[AllowAny])
     @csrf_exempt
     def upload(self, request):
@@ -112,85 +169,86 @@ class DatasetViewSet(viewsets.ModelViewSet):
         name = serializer.validated_data.get('name', file.name)
         
         try:
-            # Process CSV file
-            df = pd.read_csv(file)
-            
-            # Validate required columns
-            required_columns = ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            
-            if missing_columns:
-                return Response({
-                    'error': f'Missing required columns: {", ".join(missing_columns)}'
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            # Create dataset with authenticated user
-            dataset = Dataset.objects.create(
-                user=request.user,
-                name=name,
-                file=file
-            )
-            
-            # Process and save equipment data
-            equipment_list = []
-            equipment_types = {}
-            
-            for _, row in df.iterrows():
-                equipment = EquipmentData(
-                    dataset=dataset,
-                    equipment_name=row['Equipment Name'],
-                    equipment_type=row['Type'],
-                    flowrate=float(row['Flowrate']),
-                    pressure=float(row['Pressure']),
-                    temperature=float(row['Temperature'])
-                )
-                equipment_list.append(equipment)
-                
-                # Count equipment types
-                eq_type = row['Type']
-                equipment_types[eq_type] = equipment_types.get(eq_type, 0) + 1
-            
-            # Bulk create equipment records
-            EquipmentData.objects.bulk_create(equipment_list)
-            
-            # Calculate and save statistics
-            dataset.total_count = len(equipment_list)
-            dataset.avg_flowrate = df['Flowrate'].mean()
-            dataset.avg_pressure = df['Pressure'].mean()
-            dataset.avg_temperature = df['Temperature'].mean()
-            dataset.equipment_types = equipment_types
-            dataset.save()
-            
+            # Only the header is read here; rows are streamed during ingest
+            validate_csv_header(file)
+        except ValueError as e:
             return Response({
-                'message': 'File uploaded and processed successfully',
-                'dataset': DatasetSerializer(dataset).data
-            }, status=status.HTTP_201_CREATED)
-            
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            # Clean up if something went wrong
-            if 'dataset' in locals():
-                dataset.delete()
-            
             return Response({
                 'error': f'Error processing file: {str(e)}'
             }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Orphaned ingests must not be mistaken for ones still in flight
+        fail_stale_ingest_jobs()
+        
+        # Reuse an earlier upload of the same bytes instead of re-ingesting
+        content_hash = get_upload_hash(request, 'file', file)
+        existing = Dataset.objects.filter(
+            user=request.user, content_hash=content_hash
+        ).order_by('-is_ready', '-uploaded_at').first()
+        
+        if existing is not None and not existing.is_ready:
+            job = existing.ingest_jobs.filter(
+                status__in=IngestJob.ACTIVE_STATUSES
+            ).order_by('-created_at').first()
+            if job is not None:
+                # Identical file is still being ingested; follow that job
+                return Response({
+                    'message': 'Identical file is already being processed',
+                    'deduplicated': True,
+                    'job': IngestJobSerializer(job).data
+                }, status=status.HTTP_202_ACCEPTED)
+            # Left over from an ingest that never finished; ingest again
+            existing.file.delete(save=False)
+            existing.delete()
+            existing = None
+        
+        if existing is not None:
+            job = IngestJob.objects.create(
+                user=request.user,
+                dataset=existing,
+                status=IngestJob.STATUS_COMPLETED,
+                rows_processed=existing.total_count,
+                bytes_processed=file.size,
+                total_bytes=file.size,
+                deduplicated=True,
+                finished_at=timezone.now()
+            )
+            return Response({
+                'message': 'Identical file already uploaded; reusing existing dataset',
+                'deduplicated': True,
+                'job': IngestJobSerializer(job).data
+            }, status=status.HTTP_200_OK)
+        
+        # Store the upload; rows are ingested by a background worker
+        dataset = Dataset.objects.create(
+            user=request.user,
+            name=name,
+            file=file,
+            content_hash=content_hash
+        )
+        job = IngestJob.objects.create(
+            user=request.user,
+            dataset=dataset,
+            total_bytes=file.size
+        )
+        job = submit_ingest_job(job)
+        
+        return Response({
+            'message': 'File accepted for processing',
+            'deduplicated': False,
+            'job': IngestJobSerializer(job).data
+        }, status=status.HTTP_202_ACCEPTED)
     
     @action(detail=True, methods=['get'])
+    @conditional_dataset_response
+    @cache_response
     def summary(self, request, pk=None):
         """Get dataset summary statistics"""
         dataset = self.get_object()
-        
-        # Get equipment type distribution
-        type_distribution = []
-        for eq_type, count in dataset.equipment_types.items():
-            type_distribution.append({
-                'type': eq_type,
-                'count': count,
-                'percentage': round((count / dataset.total_count) * 100, 2)
-            })
-        
-        # Get parameter ranges
-        equipment = dataset.equipment.all()
+        statistics = get_statistics(dataset)
         
         summary = {
             'dataset_id': dataset.id,
@@ -198,45 +256,392 @@ class DatasetViewSet(viewsets.ModelViewSet):
             'uploaded_at': dataset.uploaded_at,
             'total_count': dataset.total_count,
             'statistics': {
-                'flowrate': {
-                    'average': round(dataset.avg_flowrate, 2),
-                    'min': round(equipment.aggregate(min=models.Min('flowrate'))['min'], 2) if equipment.exists() else 0,
-                    'max': round(equipment.aggregate(max=models.Max('flowrate'))['max'], 2) if equipment.exists() else 0,
-                },
-                'pressure': {
-                    'average': round(dataset.avg_pressure, 2),
-                    'min': round(equipment.aggregate(min=models.Min('pressure'))['min'], 2) if equipment.exists() else 0,
-                    'max': round(equipment.aggregate(max=models.Max('pressure'))['max'], 2) if equipment.exists() else 0,
-                },
-                'temperature': {
-                    'average': round(dataset.avg_temperature, 2),
-                    'min': round(equipment.aggregate(min=models.Min('temperature'))['min'], 2) if equipment.exists() else 0,
-                    'max': round(equipment.aggregate(max=models.Max('temperature'))['max'], 2) if equipment.exists() else 0,
+                field: {
+                    'count': values['count'],
+                    'average': round(values['mean'], 2),
+                    'min': round(values['min'], 2),
+                    'max': round(values['max'], 2),
+                    'std': round(values['std'], 2),
+                    'q1': round(values['q1'], 2),
+                    'median': round(values['median'], 2),
+                    'q3': round(values['q3'], 2),
                 }
+                for field, values in statistics.parameters.items()
             },
-            'type_distribution': type_distribution
+            'type_distribution': statistics.type_distribution,
+            'anomaly_counts': statistics.anomaly_counts
         }
         
         return Response(summary)
     
     @action(detail=True, methods=['get'])
-    def report(self, request, pk=None):
-        """Generate PDF report for dataset"""
+    def type_statistics(self, request, pk=None):
+        """Get parameter statistics grouped by equipment type"""
         dataset = self.get_object()
+        statistics = get_statistics(dataset)
         
-        try:
-            pdf_buffer = generate_pdf_report(dataset)
-            
-            response = HttpResponse(pdf_buffer.getvalue(), content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="equipment_report_{dataset.id}.pdf"'
-            
-            return response
-            
-        except Exception as e:
+        return Response({
+            'dataset_id': dataset.id,
+            'dataset_name': dataset.name,
+            'types': [
+                {
+                    'type': row['type'],
+                    'count': row['count'],
+                    **{
+                        field: {key: round(value, 2) for key, value in values.items()}
+                        for field, values in row.items()
+                        if field not in ('type', 'count')
+                    },
+                }
+                for row in statistics.type_statistics
+            ]
+        })
+    
+    @action(detail=True, methods=['get'])
+    def chart_data(self, request, pk=None):
+        """
+        Get downsampled histograms, series and top-N rows per parameter
+
+        The payload size is set by ?bins=, ?points= and ?top=, not by the
+        number of rows in the dataset.
+        """
+        dataset = self.get_object()
+        serializer = ChartDataQuerySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(get_chart_data(dataset, **serializer.validated_data))
+    
+    @action(detail=True, methods=['get'])
+    def diff(self, request, pk=None):
+        """
+        Get a page of equipment added, removed or changed in ?other=
+
+        Rows are matched on equipment name; a matched row is changed when
+        its type differs or a parameter moved by more than ?threshold=.
+        Filter with ?status=added|removed|changed.
+        """
+        dataset = self.get_object()
+        serializer = DiffQuerySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        params = serializer.validated_data
+        
+        other = self.get_queryset().filter(id=params['other']).first()
+        if other is None:
+            return Response({
+                'error': f'Dataset not found: {params["other"]}'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        diff = get_diff(dataset, other, params['threshold'])
+        counts = diff_counts(diff, other)
+        if 'status' in params:
+            diff = diff[diff['status'] == params['status']]
+        
+        paginator = DiffPagination()
+        page = paginator.paginate_queryset(DiffRows(diff), request, view=self)
+        response = paginator.get_paginated_response(page)
+        response.data = {
+            'dataset_id': dataset.id,
+            'other_id': other.id,
+            'threshold': params['threshold'],
+            'counts': counts,
+            **response.data
+        }
+        return response
+    
+    @action(detail=True, methods=['get'])
+    def correlations(self, request, pk=None):
+        """Get Pearson/Spearman matrices and linear fits, overall and per type"""
+        dataset = self.get_object()
+        statistics = get_statistics(dataset)
+        
+        return Response({
+            'dataset_id': dataset.id,
+            'dataset_name': dataset.name,
+            **get_correlations(dataset, statistics)
+        })
+    
+    @action(detail=True, methods=['get'])
+    def anomalies(self, request, pk=None):
+        """
+        Get a keyset-paginated page of flagged rows, highest score first
+
+        Filter with ?flag=zscore|iqr|type, ?type= and ?min_score=. Only
+        flagged rows have a positive score, so the anomaly index is scanned
+        over them alone.
+        """
+        dataset = self.get_object()
+        serializer = AnomalyQuerySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        filters = serializer.validated_data
+        
+        # Flags are refreshed whenever outdated statistics are rebuilt
+        get_statistics(dataset)
+        queryset = dataset.equipment.filter(anomaly_score__gt=0)
+        if filters.get('min_score'):
+            queryset = queryset.filter(anomaly_score__gte=filters['min_score'])
+        if 'flag' in filters:
+            queryset = queryset.filter(anomaly_flags__in=flag_values(FLAGS[filters['flag']]))
+        if 'type' in filters:
+            queryset = queryset.filter(equipment_type=filters['type'])
+        
+        paginator = AnomalyKeysetPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        return paginator.get_paginated_response(AnomalySerializer(page, many=True).data)
+    
+    @action(detail=True, methods=['get'],
+            renderer_classes=api_settings.DEFAULT_RENDERER_CLASSES + [ColumnarJSONRenderer])
+    def equipment(self, request, pk=None):
+        """
+        Get a keyset-paginated page of the dataset's equipment rows
+
+        ?format=columnar returns results as one array per field, read
+        straight from the rows' values instead of serialized per row.
+        ?fields=/?exclude= limit the fields (and columns read) either way.
+        """
+        dataset = self.get_object()
+        paginator = EquipmentKeysetPagination()
+        if request.accepted_renderer.format == 'columnar':
+            fields = EquipmentDataSerializer.selected_fields(request.query_params)
+            # The cursor needs the ordering columns even when not selected
+            columns = fields + [field for field in paginator.ordering if field not in fields]
+            page = paginator.paginate_queryset(
+                dataset.equipment.values_list(*columns, named=True), request, view=self
+            )
+            values = list(zip(*page)) if page else [()] * len(columns)
+            return paginator.get_paginated_response(
+                {field: list(column) for field, column in zip(fields, values)}
+            )
+        # The related manager reads dataset_id to attach the known dataset
+        queryset = EquipmentDataSerializer.project(
+            dataset.equipment.all(), request, always=paginator.ordering + ('dataset',)
+        )
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = EquipmentDataSerializer(page, many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
+    
+    @action(detail=True, methods=['get'],
+            renderer_classes=[CSVRenderer, NDJSONRenderer, ArrowRenderer, ParquetRenderer])
+    def export(self, request, pk=None):
+        """
+        Stream the dataset's equipment rows as CSV, NDJSON, an Arrow IPC
+        stream or Parquet (the last two need pyarrow)
+        """
+        dataset = self.get_object()
+        export_format = request.accepted_renderer.format
+        if export_format in ARROW_FORMATS and pa is None:
+            return Response(
+                {'error': f'{export_format} export requires pyarrow to be installed'},
+                status=status.HTTP_501_NOT_IMPLEMENTED
+            )
+        
+        response = StreamingHttpResponse(
+            EXPORT_STREAMS[export_format](dataset),
+            content_type=request.accepted_renderer.media_type
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="equipment_{dataset.id}.{export_format}"'
+        )
+        return response
+    
+    @action(detail=False, methods=['get'])
+    def compare(self, request):
+        """
+        Compare several datasets' statistics against the first one
+
+        Takes ?ids=1,2,3 (or repeated ?ids=); every value comes with its
+        delta from the first dataset.
+        """
+        ids = [
+            value for param in request.query_params.getlist('ids')
+            for value in param.split(',') if value
+        ]
+        serializer = ComparisonQuerySerializer(data={'ids': ids})
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        ids = serializer.validated_data['ids']
+        datasets = {dataset.id: dataset for dataset in self.get_queryset().filter(id__in=ids)}
+        missing = [str(dataset_id) for dataset_id in ids if dataset_id not in datasets]
+        if missing:
             return Response({
-                'error': f'Error generating report: {str(e)}'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+                'error': f'Datasets not found: {", ".join(missing)}'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        return Response(compare_datasets([datasets[dataset_id] for dataset_id in ids]))
+    
+    @action(detail=False, methods=['post'])
+    def bulk_report(self, request):
+        """
+        Stream a ZIP of PDF reports for several datasets
+
+        Reports are built in parallel on the report pool and each entry is
+        sent as soon as its PDF is ready.
+        """
+        serializer = BulkReportSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        ids = serializer.validated_data['ids']
+        full = serializer.validated_data['full']
+        datasets = {dataset.id: dataset for dataset in self.get_queryset().filter(id__in=ids)}
+        missing = [str(dataset_id) for dataset_id in ids if dataset_id not in datasets]
+        if missing:
+            return Response({
+                'error': f'Datasets not found: {", ".join(missing)}'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        built = iter_built_reports([datasets[dataset_id] for dataset_id in ids], full)
+        response = StreamingHttpResponse(
+            stream_report_zip(built, full),
+            content_type='application/zip'
+        )
+        response['Content-Disposition'] = 'attachment; filename="equipment_reports.zip"'
+        return response
+    
+    @action(detail=True, methods=['get', 'post'])
+    @conditional_dataset_response
+    def report(self, request, pk=None):
+        """
+        Get the cached PDF report (GET), or queue it on the report pool (POST)
+
+        ?full=1 lists every equipment row instead of a 20 row sample.
+        """
+        dataset = self.get_object()
+        full = request.query_params.get('full', '').lower() in ('1', 'true', 'yes')
+        
+        # GET serves an already generated PDF directly
+        pdf_path = report_path(dataset, full)
+        if request.method == 'GET' and pdf_path.exists():
+            return pdf_file_response(pdf_path, dataset.id, full)
+        
+        # Reuse a report job that is already queued or running, unless the
+        # pool lost it (e.g. across a restart)
+        fail_stale_report_jobs()
+        job = dataset.report_jobs.filter(
+            status__in=ReportJob.ACTIVE_STATUSES, full=full
+        ).first()
+        
+        # Only POST starts work; GET merely points at a job in progress
+        if request.method == 'GET' and job is None:
+            return Response(
+                {'error': 'Report has not been generated; POST to this URL to queue it'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        if job is None and pdf_path.exists():
+            job = ReportJob.objects.create(
+                user=request.user,
+                dataset=dataset,
+                full=full,
+                status=ReportJob.STATUS_COMPLETED,
+                file_path=str(pdf_path),
+                finished_at=timezone.now()
+            )
+        elif job is None:
+            job = submit_report_job(
+                ReportJob.objects.create(user=request.user, dataset=dataset, full=full)
+            )
+        
+        if job.status == ReportJob.STATUS_COMPLETED:
+            message, response_status = 'Report ready', status.HTTP_200_OK
+        else:
+            message, response_status = 'Report generation queued', status.HTTP_202_ACCEPTED
+        return Response({
+            'message': message,
+            'job': ReportJobSerializer(job).data
+        }, status=response_status)
 
 
-# Import models for aggregation
-from django.db import models
+def pdf_file_response(path, dataset_id, full=False):
+    """Stream a generated PDF report as an attachment"""
+    return FileResponse(
+        open(path, 'rb'),
+        as_attachment=True,
+        filename=report_filename(dataset_id, full),
+        content_type='application/pdf'
+    )
+
+
+class IngestJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """ViewSet for polling background ingest jobs"""
+    serializer_class = IngestJobSerializer
+    
+    def get_queryset(self):
+        # Return only user's jobs
+        if self.request.user.is_authenticated:
+            return IngestJob.objects.filter(user=self.request.user)
+        return IngestJob.objects.none()
+
+
+class TrendViewSet(viewsets.GenericViewSet):
+    """ViewSet for the history of a user's dataset aggregates"""
+    
+    def get_queryset(self):
+        # Trend points outlive their datasets, so they are owned by the user
+        if self.request.user.is_authenticated:
+            return DatasetTrendPoint.objects.filter(user=self.request.user)
+        return DatasetTrendPoint.objects.none()
+    
+    def list(self, request):
+        """
+        Get trend points in ?start=&end= (inclusive dates) with rolling
+        aggregates over the last ?window= datasets
+        """
+        serializer = TrendQuerySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        params = serializer.validated_data
+        start, end, window = params.get('start'), params.get('end'), params['window']
+        
+        queryset = self.get_queryset()
+        points = (
+            queryset.filter(**range_filter(start, end))
+            .order_by('recorded_at', 'id').values_list(*TREND_FIELDS)
+        )
+        # Points just before the range fill the first rolling windows
+        preceding = []
+        if start is not None and window > 1:
+            preceding = list(
+                queryset.filter(recorded_at__lt=range_filter(start)['recorded_at__gte'])
+                .order_by('-recorded_at', '-id').values_list(*TREND_FIELDS)[:window - 1]
+            )[::-1]
+        trend = rolling_trends(points, window, preceding)
+        
+        return Response({
+            'start': start,
+            'end': end,
+            'window': window,
+            'count': len(trend),
+            'type_mix': type_mix(trend),
+            'points': trend,
+        })
+
+
+class ReportJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """ViewSet for polling and downloading background report jobs"""
+    serializer_class = ReportJobSerializer
+    
+    def get_queryset(self):
+        # Return only user's jobs
+        if self.request.user.is_authenticated:
+            return ReportJob.objects.filter(user=self.request.user)
+        return ReportJob.objects.none()
+    
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """Download the PDF built by a completed report job"""
+        job = self.get_object()
+        
+        if job.status != ReportJob.STATUS_COMPLETED:
+            return Response({
+                'error': f'Report is not ready (status: {job.status})'
+            }, status=status.HTTP_409_CONFLICT)
+        
+        if not job.file_path or not os.path.exists(job.file_path):
+            return Response({
+                'error': 'Report is no longer available'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        return pdf_file_response(job.file_path, job.dataset_id, job.full)
@@ -0,0 +1,14 @@
+"""
+Entry point for spawned report and chart worker processes
+
+Kept free of model imports: a spawned child unpickles the initializer
+before Django is configured.
+"""
+import os
+
+
+def init_report_worker(settings_module):
+    """Configure Django in a fresh report worker process"""
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
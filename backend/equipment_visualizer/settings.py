@@ -115,6 +115,10 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',  # Changed for easier access
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',  # orjson when installed
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
 }
@@ -156,9 +160,86 @@ if os.environ.get('RENDER'):
 CSRF_COOKIE_HTTPONLY = False
 CSRF_COOKIE_SAMESITE = 'Lax'
 
-# File upload settings
-FILE_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
-DATA_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
+# File upload settings (override per deployment via environment)
+# Uploads larger than FILE_UPLOAD_MAX_MEMORY_SIZE are spooled to a temp file
+FILE_UPLOAD_MAX_MEMORY_SIZE = int(os.environ.get('FILE_UPLOAD_MAX_MEMORY_SIZE', 2621440))  # 2.5MB
+DATA_UPLOAD_MAX_MEMORY_SIZE = int(os.environ.get('DATA_UPLOAD_MAX_MEMORY_SIZE', 5242880))  # 5MB
+FILE_UPLOAD_HANDLERS = [
+    'api.uploadhandlers.ContentHashUploadHandler',  # hashes bytes as they arrive
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+# Largest accepted CSV upload in bytes; 0 disables the limit
+UPLOAD_MAX_FILE_SIZE = int(os.environ.get('UPLOAD_MAX_FILE_SIZE', 1073741824))  # 1GB
+
+# Generated PDF reports and chart images, keyed by dataset version (kept out of MEDIA_ROOT)
+REPORT_CACHE_DIR = os.environ.get('REPORT_CACHE_DIR', str(BASE_DIR / 'cache' / 'reports'))
+
+# Report generation processes; 0 builds reports inside the request
+REPORT_WORKERS = int(os.environ.get('REPORT_WORKERS', 2))
+# Seconds a report job may stay queued or running before it is failed and
+# a new one queued in its place (the report pool does not survive a restart)
+REPORT_JOB_TIMEOUT = int(os.environ.get('REPORT_JOB_TIMEOUT', 1800))
+
+# Chart rendering processes per report worker; 0 draws charts in-line
+CHART_WORKERS = int(os.environ.get('CHART_WORKERS', min(3, (os.cpu_count() or 1) - 1)))
+
+# Cached API responses (list/detail/summary) and their lifetime in seconds.
+# They live in their own cache so MAX_ENTRIES bounds them: per process and
+# least recently used first in local memory, or in total (culled regardless
+# of use) in a file cache. Invalidation is shared through the database either way
+API_CACHE_ALIAS = 'api_responses'
+API_CACHE_MAX_ENTRIES = int(os.environ.get('API_CACHE_MAX_ENTRIES', 500))
+API_CACHE_TIMEOUT = int(os.environ.get('API_CACHE_TIMEOUT', 3600))
+
+# Local memory cache by default; set CACHE_DIR to share a file cache
+# between server processes
+if os.environ.get('CACHE_DIR'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ['CACHE_DIR'],
+            'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', 1000))},
+        },
+        API_CACHE_ALIAS: {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.path.join(os.environ['CACHE_DIR'], 'api'),
+            'OPTIONS': {'MAX_ENTRIES': API_CACHE_MAX_ENTRIES},
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', 1000))},
+        },
+        API_CACHE_ALIAS: {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'api',
+            'OPTIONS': {'MAX_ENTRIES': API_CACHE_MAX_ENTRIES},
+        },
+    }
+
+# Seconds downsampled chart data stays in the cache
+CHART_DATA_CACHE_TIMEOUT = int(os.environ.get('CHART_DATA_CACHE_TIMEOUT', 3600))
+# Seconds an equipment diff between two datasets stays in the cache
+DIFF_CACHE_TIMEOUT = int(os.environ.get('DIFF_CACHE_TIMEOUT', 3600))
+# Longest diff (in rows) worth caching; at roughly 70 bytes a row this keeps
+# entries well under a megabyte
+DIFF_CACHE_MAX_ROWS = int(os.environ.get('DIFF_CACHE_MAX_ROWS', 5000))
 
 # Maximum number of datasets to keep
 MAX_DATASETS = 5
+
+# Rows per read_csv chunk and per bulk_create batch during CSV ingest
+INGEST_CHUNK_SIZE = int(os.environ.get('INGEST_CHUNK_SIZE', 50000))
+INGEST_BATCH_SIZE = int(os.environ.get('INGEST_BATCH_SIZE', 2000))
+# Rows fetched per server-side cursor round trip when streaming exports
+EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 2000))
+# Rows per Arrow record batch (and Parquet row group) in Arrow/Parquet exports
+ARROW_BATCH_SIZE = int(os.environ.get('ARROW_BATCH_SIZE', 65536))
+# Background ingest threads per server process; 0 ingests inside the request
+INGEST_WORKERS = int(os.environ.get('INGEST_WORKERS', 2))
+# Seconds an ingest job may go without progress before it is failed and
+# its unfinished dataset deleted (the queue does not survive a restart)
+INGEST_JOB_TIMEOUT = int(os.environ.get('INGEST_JOB_TIMEOUT', 1800))
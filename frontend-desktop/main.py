@@ -1,5 +1,6 @@
 import sys
 import os
+import time
 import requests
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
@@ -18,6 +19,7 @@ import json
 
 # API Configuration
 API_BASE_URL = "http://localhost:8000/api"
+JOB_POLL_INTERVAL = 1.0  # seconds
 
 
 class APIClient:
@@ -26,6 +28,8 @@ class APIClient:
     def __init__(self):
         self.session = requests.Session()
         self.base_url = API_BASE_URL
+        # url -> (etag, json) of responses that can be revalidated
+        self.etag_cache = {}
     
     def login(self, username, password):
         """Login user"""
@@ -35,6 +39,7 @@ class APIClient:
                 'password': password
             })
             if response.status_code == 200:
+                self.etag_cache.clear()
                 return True, response.json()
             else:
                 return False, response.json().get('error', 'Login failed')
@@ -53,12 +58,23 @@ class APIClient:
             print(f"Error fetching datasets: {e}")
             return []
     
+    def get_revalidated(self, url):
+        """GET a JSON resource, reusing the stored copy on 304 Not Modified"""
+        cached = self.etag_cache.get(url)
+        headers = {'If-None-Match': cached[0]} if cached else {}
+        response = self.session.get(url, headers=headers)
+        if response.status_code == 304 and cached:
+            return cached[1]
+        response.raise_for_status()
+        data = response.json()
+        if response.headers.get('ETag'):
+            self.etag_cache[url] = (response.headers['ETag'], data)
+        return data
+    
     def get_dataset(self, dataset_id):
         """Get specific dataset"""
         try:
-            response = self.session.get(f"{self.base_url}/datasets/{dataset_id}/")
-            response.raise_for_status()
-            return response.json()
+            return self.get_revalidated(f"{self.base_url}/datasets/{dataset_id}/")
         except requests.exceptions.RequestException as e:
             print(f"Error fetching dataset: {e}")
             return None
@@ -66,11 +82,22 @@ class APIClient:
     def get_summary(self, dataset_id):
         """Get dataset summary"""
         try:
-            response = self.session.get(f"{self.base_url}/datasets/{dataset_id}/summary/")
+            return self.get_revalidated(f"{self.base_url}/datasets/{dataset_id}/summary/")
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching summary: {e}")
+            return None
+    
+    def get_chart_data(self, dataset_id, top=10):
+        """Get downsampled chart data for every parameter"""
+        try:
+            response = self.session.get(
+                f"{self.base_url}/datasets/{dataset_id}/chart_data/",
+                params={'top': top}
+            )
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
-            print(f"Error fetching summary: {e}")
+            print(f"Error fetching chart data: {e}")
             return None
     
     def upload_dataset(self, file_path, name):
@@ -89,11 +116,56 @@ class APIClient:
         except requests.exceptions.RequestException as e:
             return False, str(e)
     
-    def download_report(self, dataset_id, save_path):
-        """Download PDF report"""
+    def get_job(self, job_id):
+        """Get background ingest job status"""
         try:
-            response = self.session.get(
+            response = self.session.get(f"{self.base_url}/jobs/{job_id}/")
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching job: {e}")
+            return None
+    
+    def wait_for_job(self, job):
+        """Poll an ingest job until it completes or fails"""
+        while job and job['status'] in ('pending', 'running'):
+            time.sleep(JOB_POLL_INTERVAL)
+            QApplication.processEvents()
+            job = self.get_job(job['id'])
+        return job
+    
+    def get_report_job(self, job_id):
+        """Get background report job status"""
+        try:
+            response = self.session.get(f"{self.base_url}/report-jobs/{job_id}/")
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching report job: {e}")
+            return None
+    
+    def download_report(self, dataset_id, save_path, full=False):
+        """Generate a PDF report on the server and download it"""
+        try:
+            response = self.session.post(
                 f"{self.base_url}/datasets/{dataset_id}/report/",
+                params={'full': 1} if full else None
+            )
+            response.raise_for_status()
+            job = response.json()['job']
+            
+            # Reports are built on the server's worker pool
+            while job and job['status'] in ('pending', 'running'):
+                time.sleep(JOB_POLL_INTERVAL)
+                QApplication.processEvents()
+                job = self.get_report_job(job['id'])
+            if not job:
+                return False, "Lost track of the report job"
+            if job['status'] == 'failed':
+                return False, job['error']
+            
+            response = self.session.get(
+                f"{self.base_url}/report-jobs/{job['id']}/download/",
                 stream=True
             )
             response.raise_for_status()
@@ -259,9 +331,6 @@ class ChartWidget(QWidget):
         self.figure.clear()
         ax = self.figure.add_subplot(111)
         
-        # Limit to first 10 equipment
-        equipment_data = equipment_data[:10]
-        
         names = [eq['equipment_name'][:15] for eq in equipment_data]
         flowrates = [eq['flowrate'] for eq in equipment_data]
         pressures = [eq['pressure'] for eq in equipment_data]
@@ -284,6 +353,25 @@ class ChartWidget(QWidget):
         
         self.figure.tight_layout()
         self.canvas.draw()
+    
+    def plot_series(self, parameters, title):
+        """Plot downsampled parameter series across all equipment"""
+        self.figure.clear()
+        ax = self.figure.add_subplot(111)
+        
+        colors = {'flowrate': '#3f51b5', 'pressure': '#ff4081', 'temperature': '#4caf50'}
+        for field, color in colors.items():
+            series = parameters[field]['series']
+            ax.plot(series['x'], series['y'], label=field.capitalize(), color=color, linewidth=1)
+        
+        ax.set_title(title, fontsize=14, fontweight='bold')
+        ax.set_xlabel('Equipment (sorted by name)')
+        ax.set_ylabel('Value')
+        ax.legend()
+        ax.grid(alpha=0.3)
+        
+        self.figure.tight_layout()
+        self.canvas.draw()
 
 
 class MainWindow(QMainWindow):
@@ -293,6 +381,7 @@ class MainWindow(QMainWindow):
         super().__init__()
         self.api_client = api_client
         self.current_dataset = None
+        self.current_chart_data = None
         self.init_ui()
         self.load_datasets()
     
@@ -418,11 +507,18 @@ class MainWindow(QMainWindow):
         
         # Download report button
         self.download_report_btn = QPushButton('📄 Download PDF Report')
-        self.download_report_btn.clicked.connect(self.download_report)
+        self.download_report_btn.clicked.connect(lambda: self.download_report())
         self.download_report_btn.setEnabled(False)
         self.download_report_btn.setMaximumWidth(200)
         layout.addWidget(self.download_report_btn)
         
+        # Full report lists every equipment row
+        self.download_full_report_btn = QPushButton('📑 Download Full Report')
+        self.download_full_report_btn.clicked.connect(lambda: self.download_report(full=True))
+        self.download_full_report_btn.setEnabled(False)
+        self.download_full_report_btn.setMaximumWidth(200)
+        layout.addWidget(self.download_full_report_btn)
+        
         # Charts container
         charts_widget = QWidget()
         charts_layout = QVBoxLayout()
@@ -437,6 +533,11 @@ class MainWindow(QMainWindow):
         charts_layout.addWidget(QLabel('Parameter Comparison:'))
         charts_layout.addWidget(self.param_chart)
         
+        # Downsampled profile over every row
+        self.profile_chart = ChartWidget()
+        charts_layout.addWidget(QLabel('Parameter Profile:'))
+        charts_layout.addWidget(self.profile_chart)
+        
         charts_widget.setLayout(charts_layout)
         
         # Scroll area for charts
@@ -468,7 +569,9 @@ class MainWindow(QMainWindow):
         full_dataset = self.api_client.get_dataset(dataset_id)
         
         if full_dataset:
+            # Charts come pre-aggregated from the server, not from the rows
             self.current_dataset = full_dataset
+            self.current_chart_data = self.api_client.get_chart_data(dataset_id)
             self.update_visualizations()
             self.tabs.setCurrentIndex(2)  # Switch to visualization tab
     
@@ -490,6 +593,7 @@ class MainWindow(QMainWindow):
         
         # Enable download button
         self.download_report_btn.setEnabled(True)
+        self.download_full_report_btn.setEnabled(True)
         
         # Plot type distribution
         self.type_chart.plot_pie_chart(
@@ -497,11 +601,16 @@ class MainWindow(QMainWindow):
             'Equipment Type Distribution'
         )
         
-        # Plot parameter comparison
-        if dataset.get('equipment'):
+        # Plot parameter comparison and profile
+        if self.current_chart_data:
+            parameters = self.current_chart_data['parameters']
             self.param_chart.plot_multi_bar(
-                dataset['equipment'],
-                'Parameter Comparison (First 10 Equipment)'
+                parameters['flowrate']['top'],
+                'Parameter Comparison (Top 10 by Flowrate)'
+            )
+            self.profile_chart.plot_series(
+                parameters,
+                f"Parameter Profile (All {dataset['total_count']} Equipment)"
             )
     
     def browse_file(self):
@@ -537,7 +646,17 @@ class MainWindow(QMainWindow):
         success, result = self.api_client.upload_dataset(file_path, dataset_name)
         
         if success:
-            QMessageBox.information(self, 'Success', 'Dataset uploaded successfully!')
+            # The server ingests in the background; wait for the job to finish
+            job = self.api_client.wait_for_job(result.get('job'))
+            if not job or job['status'] != 'completed':
+                error = job.get('error') if job else 'Lost track of upload job'
+                QMessageBox.critical(self, 'Upload Failed', f'Upload failed: {error}')
+                return
+            
+            if result.get('deduplicated'):
+                QMessageBox.information(self, 'Success', 'Identical file already uploaded; reusing existing dataset.')
+            else:
+                QMessageBox.information(self, 'Success', 'Dataset uploaded successfully!')
             self.file_path_label.setText('No file selected')
             self.dataset_name_input.clear()
             self.load_datasets()
@@ -545,22 +664,24 @@ class MainWindow(QMainWindow):
         else:
             QMessageBox.critical(self, 'Upload Failed', f'Upload failed: {result}')
     
-    def download_report(self):
+    def download_report(self, full=False):
         """Download PDF report"""
         if not self.current_dataset:
             return
         
+        suffix = '_full' if full else ''
         save_path, _ = QFileDialog.getSaveFileName(
             self,
             'Save PDF Report',
-            f"equipment_report_{self.current_dataset['id']}.pdf",
+            f"equipment_report_{self.current_dataset['id']}{suffix}.pdf",
             'PDF Files (*.pdf)'
         )
         
         if save_path:
             success, message = self.api_client.download_report(
                 self.current_dataset['id'],
-                save_path
+                save_path,
+                full=full
             )
             
             if success:
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
-import { datasetAPI } from '../services/api';
+import { datasetAPI, reportJobAPI } from '../services/api';
 import {
     Chart as ChartJS,
     CategoryScale,
@@ -13,7 +13,19 @@ import {
     Legend,
     ArcElement,
 } from 'chart.js';
-import { Bar, Pie } from 'react-chartjs-2';
+import { Bar, Line, Pie } from 'react-chartjs-2';
+
+const EQUIPMENT_PAGE_SIZE = 100;
+const TOP_EQUIPMENT = 10;
+
+const PARAMETERS = [
+    { field: 'flowrate', label: 'Flowrate', color: '63, 81, 181' },
+    { field: 'pressure', label: 'Pressure', color: '255, 64, 129' },
+    { field: 'temperature', label: 'Temperature', color: '76, 175, 80' },
+];
+const REPORT_POLL_INTERVAL = 1000;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
 
 ChartJS.register(
     CategoryScale,
@@ -31,6 +43,10 @@ function DatasetDetail() {
     const { id } = useParams();
     const navigate = useNavigate();
     const [dataset, setDataset] = useState(null);
+    const [equipment, setEquipment] = useState([]);
+    const [chartData, setChartData] = useState(null);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState('');
     const [downloading, setDownloading] = useState(false);
@@ -38,8 +54,16 @@ function DatasetDetail() {
     useEffect(() => {
         const fetchDataset = async () => {
             try {
-                const response = await datasetAPI.get(id);
+                // Charts come pre-aggregated from the server, not from the rows
+                const [response, page, charts] = await Promise.all([
+                    datasetAPI.get(id),
+                    datasetAPI.getEquipment(id, undefined, EQUIPMENT_PAGE_SIZE),
+                    datasetAPI.getChartData(id, { top: TOP_EQUIPMENT }),
+                ]);
                 setDataset(response.data);
+                setChartData(charts.data.parameters);
+                setEquipment(page.data.results);
+                setNextCursor(page.data.next_cursor);
             } catch (err) {
                 setError('Failed to load dataset');
                 console.error(err);
@@ -50,14 +74,37 @@ function DatasetDetail() {
         fetchDataset();
     }, [id]);
 
-    const handleDownloadReport = async () => {
+    const handleLoadMore = async () => {
+        setLoadingMore(true);
+        try {
+            const page = await datasetAPI.getEquipment(id, nextCursor, EQUIPMENT_PAGE_SIZE);
+            setEquipment((rows) => rows.concat(page.data.results));
+            setNextCursor(page.data.next_cursor);
+        } catch (err) {
+            alert('Failed to load more equipment');
+            console.error(err);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
+    const handleDownloadReport = async (full = false) => {
         setDownloading(true);
         try {
-            const response = await datasetAPI.downloadReport(id);
+            // Reports are built on the server's worker pool; wait for the job
+            let job = (await datasetAPI.requestReport(id, full)).data.job;
+            while (job.status === 'pending' || job.status === 'running') {
+                await sleep(REPORT_POLL_INTERVAL);
+                job = (await reportJobAPI.get(job.id)).data;
+            }
+            if (job.status === 'failed') {
+                throw new Error(job.error);
+            }
+            const response = await reportJobAPI.download(job.id);
             const url = window.URL.createObjectURL(new Blob([response.data]));
             const link = document.createElement('a');
             link.href = url;
-            link.setAttribute('download', `equipment_report_${id}.pdf`);
+            link.setAttribute('download', `equipment_report_${id}${full ? '_full' : ''}.pdf`);
             document.body.appendChild(link);
             link.click();
             link.remove();
@@ -120,32 +167,45 @@ function DatasetDetail() {
         ],
     };
 
-    // Parameter comparison chart
+    // Parameter comparison of the highest-flowrate equipment
+    const topEquipment = chartData.flowrate.top;
     const parameterData = {
-        labels: dataset.equipment.slice(0, 10).map(eq => eq.equipment_name.substring(0, 15)),
-        datasets: [
-            {
-                label: 'Flowrate',
-                data: dataset.equipment.slice(0, 10).map(eq => eq.flowrate),
-                backgroundColor: 'rgba(63, 81, 181, 0.6)',
-                borderColor: 'rgba(63, 81, 181, 1)',
-                borderWidth: 2,
-            },
-            {
-                label: 'Pressure',
-                data: dataset.equipment.slice(0, 10).map(eq => eq.pressure),
-                backgroundColor: 'rgba(255, 64, 129, 0.6)',
-                borderColor: 'rgba(255, 64, 129, 1)',
-                borderWidth: 2,
-            },
-            {
-                label: 'Temperature',
-                data: dataset.equipment.slice(0, 10).map(eq => eq.temperature),
-                backgroundColor: 'rgba(76, 175, 80, 0.6)',
-                borderColor: 'rgba(76, 175, 80, 1)',
-                borderWidth: 2,
-            },
-        ],
+        labels: topEquipment.map(eq => eq.equipment_name.substring(0, 15)),
+        datasets: PARAMETERS.map(({ field, label, color }) => ({
+            label,
+            data: topEquipment.map(eq => eq[field]),
+            backgroundColor: `rgba(${color}, 0.6)`,
+            borderColor: `rgba(${color}, 1)`,
+            borderWidth: 2,
+        })),
+    };
+
+    // Downsampled parameter values across every row, in listing order
+    const profileData = {
+        datasets: PARAMETERS.map(({ field, label, color }) => ({
+            label,
+            data: chartData[field].series.x.map((x, i) => ({ x, y: chartData[field].series.y[i] })),
+            borderColor: `rgba(${color}, 1)`,
+            backgroundColor: `rgba(${color}, 0.6)`,
+            borderWidth: 1,
+            pointRadius: 0,
+        })),
+    };
+
+    const histogramData = (field, label, color) => {
+        const { edges, counts } = chartData[field].histogram;
+        return {
+            labels: counts.map((_, i) => `${edges[i].toFixed(1)}–${edges[i + 1].toFixed(1)}`),
+            datasets: [
+                {
+                    label,
+                    data: counts,
+                    backgroundColor: `rgba(${color}, 0.6)`,
+                    borderColor: `rgba(${color}, 1)`,
+                    borderWidth: 1,
+                },
+            ],
+        };
     };
 
     const chartOptions = {
@@ -158,6 +218,13 @@ function DatasetDetail() {
         },
     };
 
+    const profileOptions = {
+        ...chartOptions,
+        scales: {
+            x: { type: 'linear', title: { display: true, text: 'Equipment (sorted by name)' } },
+        },
+    };
+
     return (
         <div className="container" style={{ paddingTop: '40px', paddingBottom: '40px' }}>
             <div className="card">
@@ -172,12 +239,20 @@ function DatasetDetail() {
                     </div>
                     <div style={{ display: 'flex', gap: '10px' }}>
                         <button
-                            onClick={handleDownloadReport}
+                            onClick={() => handleDownloadReport(false)}
                             className="btn btn-success"
                             disabled={downloading}
                         >
                             {downloading ? 'Generating...' : '📄 Download PDF Report'}
                         </button>
+                        <button
+                            onClick={() => handleDownloadReport(true)}
+                            className="btn btn-secondary"
+                            disabled={downloading}
+                            title="Lists every equipment row"
+                        >
+                            📑 Full Report
+                        </button>
                         <button onClick={() => navigate('/')} className="btn btn-secondary">
                             ← Back
                         </button>
@@ -223,12 +298,30 @@ function DatasetDetail() {
             </div>
 
             <div className="card" style={{ marginTop: '20px' }}>
-                <h3 className="chart-title">Parameter Comparison (First 10 Equipment)</h3>
+                <h3 className="chart-title">Parameter Comparison (Top {TOP_EQUIPMENT} by Flowrate)</h3>
                 <div style={{ height: '400px' }}>
                     <Bar data={parameterData} options={chartOptions} />
                 </div>
             </div>
 
+            <div className="card" style={{ marginTop: '20px' }}>
+                <h3 className="chart-title">Parameter Profile (All {dataset.total_count} Equipment)</h3>
+                <div style={{ height: '400px' }}>
+                    <Line data={profileData} options={profileOptions} />
+                </div>
+            </div>
+
+            <div className="charts-grid">
+                {PARAMETERS.map(({ field, label, color }) => (
+                    <div className="chart-card" key={field}>
+                        <h3 className="chart-title">{label} Distribution</h3>
+                        <div style={{ height: '300px' }}>
+                            <Bar data={histogramData(field, label, color)} options={chartOptions} />
+                        </div>
+                    </div>
+                ))}
+            </div>
+
             {/* Equipment Table */}
             <div className="card">
                 <h3 style={{ fontSize: '24px', fontWeight: '600', marginBottom: '20px' }}>
@@ -246,7 +339,7 @@ function DatasetDetail() {
                             </tr>
                         </thead>
                         <tbody>
-                            {dataset.equipment.map((eq) => (
+                            {equipment.map((eq) => (
                                 <tr key={eq.id}>
                                     <td>{eq.equipment_name}</td>
                                     <td>{eq.equipment_type}</td>
@@ -258,6 +351,17 @@ function DatasetDetail() {
                         </tbody>
                     </table>
                 </div>
+                {nextCursor && (
+                    <div style={{ textAlign: 'center', marginTop: '20px' }}>
+                        <button
+                            onClick={handleLoadMore}
+                            className="btn btn-secondary"
+                            disabled={loadingMore}
+                        >
+                            {loadingMore ? 'Loading...' : `Load more (${equipment.length} of ${dataset.total_count})`}
+                        </button>
+                    </div>
+                )}
             </div>
         </div>
     );
@@ -1,6 +1,10 @@
 import React, { useState } from 'react';
 import { useNavigate } from 'react-router-dom';
-import { datasetAPI } from '../services/api';
+import { datasetAPI, jobAPI } from '../services/api';
+
+const JOB_POLL_INTERVAL = 1000;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
 
 function Upload() {
     const [file, setFile] = useState(null);
@@ -8,6 +12,7 @@ function Upload() {
     const [uploading, setUploading] = useState(false);
     const [error, setError] = useState('');
     const [success, setSuccess] = useState('');
+    const [progress, setProgress] = useState('');
     const [dragOver, setDragOver] = useState(false);
     const navigate = useNavigate();
 
@@ -64,15 +69,33 @@ function Upload() {
 
         try {
             const response = await datasetAPI.upload(formData);
-            setSuccess('File uploaded successfully!');
+            const job = await waitForJob(response.data.job);
+            if (job.status === 'failed') {
+                setError(job.error || 'Processing failed. Please check your file.');
+                return;
+            }
+            setSuccess(response.data.deduplicated
+                ? 'Identical file already uploaded. Opening the existing dataset...'
+                : 'File uploaded successfully!');
             setTimeout(() => {
-                navigate(`/dataset/${response.data.dataset.id}`);
+                navigate(`/dataset/${job.dataset}`);
             }, 1500);
         } catch (err) {
             setError(err.response?.data?.error || 'Upload failed. Please try again.');
         } finally {
             setUploading(false);
+            setProgress('');
+        }
+    };
+
+    const waitForJob = async (job) => {
+        while (job.status === 'pending' || job.status === 'running') {
+            setProgress(`Processing... ${job.rows_processed} rows (${Math.round(job.progress * 100)}%)`);
+            await sleep(JOB_POLL_INTERVAL);
+            const response = await jobAPI.get(job.id);
+            job = response.data;
         }
+        return job;
     };
 
     return (
@@ -87,6 +110,7 @@ function Upload() {
 
                 {error && <div className="alert alert-error">{error}</div>}
                 {success && <div className="alert alert-success">{success}</div>}
+                {progress && <div className="alert alert-info">{progress}</div>}
 
                 <form onSubmit={handleSubmit}>
                     <div className="form-group">
@@ -113,7 +137,7 @@ function Upload() {
                             {file ? file.name : 'Click to browse or drag and drop'}
                         </div>
                         <div className="upload-hint">
-                            CSV files only (max 5MB)
+                            CSV files only
                         </div>
                         <input
                             id="fileInput"
@@ -34,13 +34,30 @@ export const datasetAPI = {
             },
         });
     },
+    getEquipment: (id, cursor, pageSize) => api.get(`/datasets/${id}/equipment/`, {
+        params: { cursor, page_size: pageSize },
+    }),
     getSummary: (id) => api.get(`/datasets/${id}/summary/`),
-    downloadReport: (id) => {
-        return api.get(`/datasets/${id}/report/`, {
+    getChartData: (id, params = {}) => api.get(`/datasets/${id}/chart_data/`, { params }),
+    requestReport: (id, full = false) => api.post(`/datasets/${id}/report/`, null, {
+        params: full ? { full: 1 } : {},
+    }),
+    delete: (id) => api.delete(`/datasets/${id}/`),
+};
+
+// Background ingest jobs
+export const jobAPI = {
+    get: (id) => api.get(`/jobs/${id}/`),
+};
+
+// Background report jobs
+export const reportJobAPI = {
+    get: (id) => api.get(`/report-jobs/${id}/`),
+    download: (id) => {
+        return api.get(`/report-jobs/${id}/download/`, {
             responseType: 'blob',
         });
     },
-    delete: (id) => api.delete(`/datasets/${id}/`),
 };
 
 export default api;